@@ -4,48 +4,131 @@ from __future__ import annotations
 
 import logging
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_API_KEY, CONF_MAC
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
-    CONF_AUTO_UNLOCK_LOW_BATTERY,
-    CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
-    DEFAULT_AUTO_UNLOCK_LOW_BATTERY,
-    DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
+    ATTR_DURATION,
+    CONF_API_URL,
+    DEFAULT_PROFILE_DURATION,
     DOMAIN,
+    MAX_PROFILE_DURATION,
     PLATFORMS,
+    SERVICE_PROFILE,
 )
+from .api import API_BASE_URL, normalize_identifier
 from .device import Yeelock
+from .manager import YeelockManager
 
 
 _LOGGER = logging.getLogger(__name__)
 
+# Only used to point development setups at scripts/fake_cloud.py.
+CONFIG_SCHEMA = vol.Schema(
+    {DOMAIN: vol.Schema({vol.Optional(CONF_API_URL): cv.url})},
+    extra=vol.ALLOW_EXTRA,
+)
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Yeelock from a config entry."""
-    if DOMAIN not in hass.data:
-        hass.data[DOMAIN] = {}
-    config = {
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Yeelock manager and services."""
+    api_url = config.get(DOMAIN, {}).get(CONF_API_URL, API_BASE_URL)
+    if api_url != API_BASE_URL:
+        _LOGGER.warning("Using the Yeelock cloud at %s", api_url)
+    manager = hass.data[DOMAIN] = YeelockManager(hass, api_url)
+    await manager.async_setup()
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the integration and return the summary."""
+        return await manager.profiler.async_profile(call.data[ATTR_DURATION])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
+
+def _entry_config(entry: ConfigEntry) -> dict:
+    """Merge entry data and options; the device fills in defaults."""
+    return {
         **entry.data,
         **entry.options,
     }
-    config.setdefault(CONF_AUTO_UNLOCK_LOW_BATTERY, DEFAULT_AUTO_UNLOCK_LOW_BATTERY)
-    config.setdefault(
-        CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
-        DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
-    )
 
-    yeelock_device = Yeelock(config, hass)
-    hass.data[DOMAIN][entry.unique_id] = yeelock_device
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Yeelock from a config entry."""
+    manager: YeelockManager = hass.data[DOMAIN]
+    config = _entry_config(entry)
+
+    state_cache = manager.async_get_state_cache(entry.entry_id)
+    await state_cache.async_load()
+    entry.async_on_unload(state_cache.async_flush)
+
+    yeelock_device = Yeelock(config, hass, entry, manager)
+    yeelock_device.async_restore_state(state_cache)
+    entry.async_on_unload(yeelock_device.async_track_presence())
+    manager.async_add_device(yeelock_device)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running device.
+
+    The connection and learned state are kept. Only a new address or a key
+    that the device does not already use needs a full reload.
+    """
+    manager: YeelockManager = hass.data[DOMAIN]
+    device = manager.async_get_entry_device(entry.entry_id)
+    if (
+        device is None
+        or normalize_identifier(device.mac) != normalize_identifier(entry.data[CONF_MAC])
+        or device.key != entry.data.get(CONF_API_KEY)
+    ):
+        _LOGGER.debug("Reloading %s for changed connection settings", entry.title)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    device.async_apply_options(_entry_config(entry))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        await hass.data[DOMAIN][entry.unique_id].disconnect()
-        hass.data[DOMAIN].pop(entry.unique_id)
+        manager: YeelockManager = hass.data[DOMAIN]
+        if device := manager.async_get_entry_device(entry.entry_id):
+            await device.tasks.async_shutdown()
+            await device.disconnect()
+            manager.async_remove_device(device)
     _LOGGER.info("Unload %s", entry.unique_id)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached state of a deleted entry."""
+    manager: YeelockManager = hass.data[DOMAIN]
+    await manager.async_pop_state_cache(entry.entry_id).async_remove()
@@ -0,0 +1,241 @@
+"""Yeelock cloud API client."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+from time import monotonic
+from typing import Any
+
+import aiohttp
+import async_timeout
+from homeassistant.const import CONF_COUNTRY_CODE
+
+from .const import CONF_PHONE
+from .profiler import timed_async
+
+_LOGGER = logging.getLogger(__name__)
+
+API_BASE_URL = "https://api.yeeloc.com"
+
+ENDPOINT_AUTH = "auth"
+ENDPOINT_DEVICE_LIST = "device_list"
+
+ENDPOINT_TIMEOUTS = {
+    ENDPOINT_AUTH: 10,
+    ENDPOINT_DEVICE_LIST: 15,
+}
+DEFAULT_TIMEOUT = 10
+
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+LOCK_IDENTIFIER_KEYS = ("sn", "name", "mac", "ble_mac", "bluetooth_mac", "bt_mac")
+
+
+def build_login_account(saved_account: dict[str, Any]) -> str:
+    """Build the cloud login account string for API auth."""
+    if saved_account.get(CONF_COUNTRY_CODE):
+        return f"{saved_account[CONF_COUNTRY_CODE]} {saved_account[CONF_PHONE]}"
+    return saved_account[CONF_PHONE]
+
+
+def normalize_identifier(value: str | None) -> str:
+    """Normalize lock identifiers for reliable comparisons."""
+    if not value:
+        return ""
+    normalized = value.strip().upper()
+    if normalized.startswith("EL_"):
+        normalized = normalized.removeprefix("EL_")
+    return normalized.replace(":", "").replace("-", "").replace("_", "")
+
+
+def index_locks(locks: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Index cloud locks by each of their normalized identifiers."""
+    index: dict[str, dict[str, Any]] = {}
+    for lock in locks:
+        for key in LOCK_IDENTIFIER_KEYS:
+            if identifier := normalize_identifier(lock.get(key)):
+                index.setdefault(identifier, lock)
+    return index
+
+
+def find_matching_lock(
+    locks: list[dict[str, Any]] | dict[str, dict[str, Any]], *identifiers: str | None
+) -> dict[str, Any] | None:
+    """Return the cloud lock matching any of the given bluetooth identifiers.
+
+    Accepts either the cloud lock list or an index built by index_locks.
+    """
+    index = locks if isinstance(locks, dict) else index_locks(locks)
+    for identifier in identifiers:
+        if (normalized := normalize_identifier(identifier)) and normalized in index:
+            return index[normalized]
+    return None
+
+
+class YeelockApiError(Exception):
+    """Base API exception raised by the Yeelock integration."""
+
+
+class YeelockAuthError(YeelockApiError):
+    """Raised when authentication with the Yeelock cloud fails."""
+
+
+class YeelockAccountNotRegisteredError(YeelockAuthError):
+    """Raised when the Yeelock account has not been registered."""
+
+
+class _YeelockTransientError(YeelockApiError):
+    """Raised for failures that are worth retrying."""
+
+
+class YeelockApiClient:
+    """Async client for the Yeelock cloud.
+
+    The client reuses the given aiohttp session so connections to the cloud
+    are kept alive between requests.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str = API_BASE_URL,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff: float = BACKOFF_BASE,
+        timeouts: dict[str, float] | None = None,
+    ) -> None:
+        """Initialize the client."""
+        self._session = session
+        self._base_url = base_url.rstrip("/")
+        self._max_attempts = max(1, max_attempts)
+        self._backoff = backoff
+        self._timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.stats: dict[str, dict[str, float]] = {}
+
+    async def async_login(self, account: str, password: str) -> str:
+        """Authenticate against the cloud and return the access token."""
+        login = await self._request(
+            ENDPOINT_AUTH,
+            method="post",
+            path="/v2/auth/by/password",
+            data={
+                "account": account,
+                "password": password,
+            },
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
+                "Accept": "*/*",
+            },
+        )
+        token = login.get("data", {}).get("access_token")
+        if not token:
+            raise YeelockAuthError
+        return token
+
+    async def async_get_devices(self, token: str) -> list[dict[str, Any]]:
+        """Return all locks visible to the account."""
+        response = await self._request(
+            ENDPOINT_DEVICE_LIST,
+            method="get",
+            path="/v2/user/device/list",
+            params={"group_id": -1},
+            headers={
+                "Accept": "*/*",
+                "Authorization": token,
+            },
+        )
+        devices = response.get("data") or []
+        _LOGGER.debug("Cloud returned %s device(s)", len(devices))
+        return devices
+
+    async def _request(self, endpoint: str, method: str, path: str, **kwargs) -> Any:
+        """Send a request, retrying transient failures with backoff."""
+        stats = self.stats.setdefault(
+            endpoint,
+            {"requests": 0, "failures": 0, "retries": 0, "last": 0.0, "total": 0.0},
+        )
+        timeout = self._timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+        attempt = 1
+        while True:
+            start = monotonic()
+            try:
+                return await self._request_once(method, path, timeout, **kwargs)
+            except _YeelockTransientError as error:
+                if attempt >= self._max_attempts:
+                    stats["failures"] += 1
+                    raise YeelockApiError(str(error)) from error
+                transient_error = error
+            except YeelockApiError:
+                stats["failures"] += 1
+                raise
+            finally:
+                elapsed = monotonic() - start
+                stats["requests"] += 1
+                stats["last"] = elapsed
+                stats["total"] += elapsed
+                _LOGGER.debug("Cloud %s request took %.0fms", endpoint, elapsed * 1000)
+
+            delay = self._backoff * 2 ** (attempt - 1)
+            stats["retries"] += 1
+            _LOGGER.debug(
+                "Retrying %s in %.1fs after attempt %s failed: %s",
+                endpoint,
+                delay,
+                attempt,
+                transient_error,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @timed_async("cloud request")
+    async def _request_once(
+        self, method: str, path: str, timeout: float, **kwargs
+    ) -> Any:
+        """Send a single request and map errors to Yeelock exceptions."""
+        try:
+            async with (
+                async_timeout.timeout(timeout),
+                self._session.request(
+                    method=method,
+                    url=f"{self._base_url}{path}",
+                    **kwargs,
+                ) as response,
+            ):
+                if response.status in (400, 401, 403):
+                    raise YeelockAuthError
+                if response.status in RETRY_STATUSES:
+                    raise _YeelockTransientError(
+                        f"Cloud returned HTTP {response.status}"
+                    )
+                response.raise_for_status()
+                response_json = await response.json()
+
+        except TimeoutError as exception:
+            raise _YeelockTransientError(
+                "Timeout error fetching information"
+            ) from exception
+        except (aiohttp.ClientConnectionError, socket.gaierror) as exception:
+            raise _YeelockTransientError("Error fetching information") from exception
+        except aiohttp.ClientError as exception:
+            raise YeelockApiError("Error fetching information") from exception
+
+        if isinstance(response_json, dict) and response_json.get("code") == 401:
+            raise YeelockAuthError
+
+        if isinstance(response_json, dict) and response_json.get("code") == 1009:
+            raise YeelockAccountNotRegisteredError
+
+        if isinstance(response_json, dict) and response_json.get("code") not in (
+            None,
+            0,
+        ):
+            raise YeelockApiError(
+                response_json.get("message", "Error fetching information")
+            )
+
+        return response_json
@@ -2,9 +2,6 @@
 
 from __future__ import annotations
 
-import aiohttp
-import async_timeout
-import socket
 import logging
 from typing import Any
 
@@ -23,15 +20,38 @@ from homeassistant.const import (
     CONF_MODEL,
     CONF_API_KEY,
 )
-from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.components.bluetooth import (
+    BluetoothServiceInfoBleak,
+    async_discovered_service_info,
+)
 from homeassistant.data_entry_flow import FlowResult
 
+from .api import (
+    YeelockAccountNotRegisteredError,
+    YeelockApiClient,
+    YeelockApiError,
+    YeelockAuthError,
+    build_login_account,
+    find_matching_lock,
+    index_locks,
+)
 from .const import (
+    ACCOUNT_STORE_KEY,
+    ACCOUNT_STORE_VERSION,
+    CONF_ACCOUNT_ID,
+    CONF_AUTO_RELOCK_DELAY,
     CONF_AUTO_UNLOCK_LOW_BATTERY,
     CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
+    CONF_OPTIMISTIC,
     CONF_PHONE,
+    CONF_SESSION_TRACE,
+    CONF_UNAVAILABLE_AFTER,
+    DEFAULT_AUTO_RELOCK_DELAY,
     DEFAULT_AUTO_UNLOCK_LOW_BATTERY,
     DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_SESSION_TRACE,
+    DEFAULT_UNAVAILABLE_AFTER,
     DOMAIN,
 )
 
@@ -40,10 +60,6 @@ _LOGGER = logging.getLogger(__name__)
 CONF_ACCOUNT_TYPE = "account_type"
 ACCOUNT_TYPE_EMAIL = "email"
 ACCOUNT_TYPE_PHONE = "phone"
-CONF_ACCOUNT_ID = "account_id"
-
-ACCOUNT_STORE_KEY = f"{DOMAIN}_accounts"
-ACCOUNT_STORE_VERSION = 1
 
 STEP_USER_DATA_SCHEMA = voluptuous.Schema(
     {
@@ -76,6 +92,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._discovery_info: BluetoothServiceInfoBleak | None = None
         self._discovered_devices: dict[str, BluetoothServiceInfoBleak] = {}
         self._account_type: str = ACCOUNT_TYPE_EMAIL
+        self._api_client: YeelockApiClient | None = None
+
+    @property
+    def api_client(self) -> YeelockApiClient:
+        """Return the cloud client used by this flow."""
+        if (manager := self.hass.data.get(DOMAIN)) is not None:
+            return manager.api_client
+        if self._api_client is None:
+            self._api_client = YeelockApiClient(async_get_clientsession(self.hass))
+        return self._api_client
 
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
@@ -120,9 +146,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     @staticmethod
     def _build_login_account(saved_account: dict[str, Any]) -> str:
         """Build the cloud login account string for API auth."""
-        if saved_account.get(CONF_COUNTRY_CODE):
-            return f"{saved_account[CONF_COUNTRY_CODE]} {saved_account[CONF_PHONE]}"
-        return saved_account[CONF_PHONE]
+        return build_login_account(saved_account)
 
     @staticmethod
     def _sanitize_account_for_store(saved_account: dict[str, Any]) -> dict[str, Any]:
@@ -194,16 +218,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             accounts.append(sanitized)
 
         await store.async_save({"accounts": accounts})
-
-    @staticmethod
-    def _normalize_identifier(value: str | None) -> str:
-        """Normalize lock identifiers for reliable comparisons."""
-        if not value:
-            return ""
-        normalized = value.strip().upper()
-        if normalized.startswith("EL_"):
-            normalized = normalized.removeprefix("EL_")
-        return normalized.replace(":", "").replace("-", "").replace("_", "")
+        if (manager := self.hass.data.get(DOMAIN)) is not None:
+            manager.async_invalidate_accounts()
 
     async def _async_try_auto_configure_from_saved_account(self) -> FlowResult | None:
         """Try to configure from previously saved credentials."""
@@ -249,67 +265,20 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def _async_login_and_get_token(self, account: str, password: str) -> str:
         """Authenticate against cloud and return token."""
-        login = await self._api_wrapper(
-            method="post",
-            url="https://api.yeeloc.com/v2/auth/by/password",
-            data={
-                "account": account,
-                "password": password,
-            },
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
-                "Accept": "*/*",
-            },
-        )
-        token = login.get("data", {}).get("access_token")
-        if not token:
-            raise YeelockAuthError
-        return token
+        return await self.api_client.async_login(account, password)
 
     async def _async_get_matching_lock(self, token: str) -> dict[str, Any] | None:
         """Find the discovered lock in the cloud lock list."""
         if not self._discovery_info:
             return None
 
-        locks_response = await self._api_wrapper(
-            method="get",
-            url="https://api.yeeloc.com/v2/user/device/list",
-            params={"group_id": -1},
-            headers={
-                "Accept": "*/*",
-                "Authorization": token,
-            },
-        )
-
-        locks = locks_response.get("data", [])
-        _LOGGER.debug(locks_response)
-        discovered_name = self._discovery_info.name
-        discovered_address = self._discovery_info.address
-        normalized_discovered_name = self._normalize_identifier(discovered_name)
-        normalized_discovered_address = self._normalize_identifier(discovered_address)
-        if not discovered_name:
+        locks = await self.api_client.async_get_devices(token)
+        if not self._discovery_info.name:
             _LOGGER.debug("Unable to match lock: discovered bluetooth device name is missing")
 
-        for lock in locks:
-            lock_identifiers = {
-                self._normalize_identifier(lock.get("sn")),
-                self._normalize_identifier(lock.get("name")),
-                self._normalize_identifier(lock.get("mac")),
-                self._normalize_identifier(lock.get("ble_mac")),
-                self._normalize_identifier(lock.get("bluetooth_mac")),
-                self._normalize_identifier(lock.get("bt_mac")),
-            }
-            lock_identifiers.discard("")
-
-            if (
-                normalized_discovered_name
-                and normalized_discovered_name in lock_identifiers
-            ) or (
-                normalized_discovered_address
-                and normalized_discovered_address in lock_identifiers
-            ):
-                return lock
-        return None
+        return find_matching_lock(
+            locks, self._discovery_info.name, self._discovery_info.address
+        )
 
     async def async_step_account_type(
         self, user_input: dict[str, Any] | None = None
@@ -391,51 +360,39 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             _LOGGER.debug("Starting user login")
 
             if self._discovery_info and self._discovery_info.address:
-                address = self._discovery_info.address
-            else:
-                _LOGGER.debug("Integration must be set-up from auto-discovery")
-                return self.async_abort(reason="no_devices_found")
-
-            await self.async_set_unique_id(address, raise_on_progress=False)
-            self._abort_if_unique_id_configured()
+                await self.async_set_unique_id(
+                    self._discovery_info.address, raise_on_progress=False
+                )
+                self._abort_if_unique_id_configured()
 
             account = user_input[CONF_PHONE]
             if is_phone:
                 account = f"{user_input[CONF_COUNTRY_CODE]} {user_input[CONF_PHONE]}"
+            account_id = self._build_account_id(account)
+            account_data = {
+                CONF_ACCOUNT_ID: account_id,
+                CONF_PHONE: user_input[CONF_PHONE],
+                CONF_PASSWORD: user_input[CONF_PASSWORD],
+            }
+            if is_phone:
+                account_data[CONF_COUNTRY_CODE] = user_input[CONF_COUNTRY_CODE]
 
             try:
                 token = await self._async_login_and_get_token(
                     account, user_input[CONF_PASSWORD]
                 )
+                if not self._discovery_info:
+                    return await self._async_import_visible_locks(
+                        token, account_data, user_input
+                    )
+
                 lock = await self._async_get_matching_lock(token)
                 if lock:
                     _LOGGER.debug("Found lock and key")
-                    account_id = self._build_account_id(account)
-                    account_data = {
-                        CONF_ACCOUNT_ID: account_id,
-                        CONF_PHONE: user_input[CONF_PHONE],
-                        CONF_PASSWORD: user_input[CONF_PASSWORD],
-                    }
-                    if is_phone:
-                        account_data[CONF_COUNTRY_CODE] = user_input[CONF_COUNTRY_CODE]
                     await self._async_save_account_data(account_data)
-
-                    entry_data: dict[str, Any] = {
-                        CONF_ACCOUNT_ID: account_id,
-                        CONF_AUTO_UNLOCK_LOW_BATTERY: user_input.get(
-                            CONF_AUTO_UNLOCK_LOW_BATTERY,
-                            DEFAULT_AUTO_UNLOCK_LOW_BATTERY,
-                        ),
-                        CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD: user_input.get(
-                            CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
-                            DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
-                        ),
-                    }
-                    entry_data[CONF_MAC] = address
-                    entry_data[CONF_NAME] = lock["name"]
-                    entry_data[CONF_MODEL] = lock["type"]
-                    entry_data[CONF_API_KEY] = lock["ble_sign_key"]
-
+                    entry_data = self._build_entry_data(
+                        account_id, user_input, self._discovery_info.address, lock
+                    )
                     return self.async_create_entry(
                         title=entry_data[CONF_NAME], data=entry_data
                     )
@@ -461,74 +418,93 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors=errors,
             )
 
-    async def async_step_user(
-        self, user_input: dict[str, Any] | None = None
-    ) -> FlowResult:
-        """Handle the initial step."""
-        _LOGGER.debug("Integration must be set-up from auto-discovery")
-        return self.async_abort(reason="no_devices_found")
+    @staticmethod
+    def _build_entry_data(
+        account_id: str,
+        user_input: dict[str, Any],
+        address: str,
+        lock: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Build config entry data for a cloud lock."""
+        return {
+            CONF_ACCOUNT_ID: account_id,
+            CONF_AUTO_UNLOCK_LOW_BATTERY: user_input.get(
+                CONF_AUTO_UNLOCK_LOW_BATTERY,
+                DEFAULT_AUTO_UNLOCK_LOW_BATTERY,
+            ),
+            CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD: user_input.get(
+                CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
+                DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
+            ),
+            CONF_MAC: address,
+            CONF_NAME: lock["name"],
+            CONF_MODEL: lock["type"],
+            CONF_API_KEY: lock["ble_sign_key"],
+        }
 
-    async def _api_wrapper(
+    async def _async_import_visible_locks(
         self,
-        method: str,
-        url: str,
-        data: dict | None = None,
-        json: dict | None = None,
-        params: dict | None = None,
-        headers: dict | None = None,
-    ) -> Any:
-        """Get information from the API."""
-        session = async_get_clientsession(self.hass)
-
-        try:
-            async with async_timeout.timeout(10):
-                response = await session.request(
-                    method=method,
-                    url=url,
-                    data=data,
-                    json=json,
-                    params=params,
-                    headers=headers,
-                )
-                if response.status in (400, 401, 403):
-                    raise YeelockAuthError
-                response.raise_for_status()
-                response_json = await response.json()
-
-                if isinstance(response_json, dict) and response_json.get("code") == 401:
-                    raise YeelockAuthError
-
-                if isinstance(response_json, dict) and response_json.get("code") == 1009:
-                    raise YeelockAccountNotRegisteredError
-
-                if isinstance(response_json, dict) and response_json.get(
-                    "code"
-                ) not in (None, 0):
-                    raise YeelockApiError(
-                        response_json.get("message", "Error fetching information")
-                    )
-
-                return response_json
-
-        except TimeoutError as exception:
-            raise YeelockApiError("Timeout error fetching information") from exception
-        except (aiohttp.ClientError, socket.gaierror) as exception:
-            raise YeelockApiError("Error fetching information") from exception
-
+        token: str,
+        account_data: dict[str, Any],
+        user_input: dict[str, Any],
+    ) -> FlowResult:
+        """Create entries for every visible lock on the account.
+
+        The device list is fetched once and indexed, then every connectable
+        bluetooth device that is not configured yet is matched against it.
+        """
+        locks = index_locks(await self.api_client.async_get_devices(token))
+        configured = self._async_current_ids()
+        matches: dict[str, dict[str, Any]] = {}
+        for service_info in async_discovered_service_info(self.hass, connectable=True):
+            if service_info.address in configured or service_info.address in matches:
+                continue
+            if lock := find_matching_lock(
+                locks, service_info.name, service_info.address
+            ):
+                matches[service_info.address] = lock
 
-class YeelockApiError(Exception):
-    """Base API exception raised by the Yeelock integration."""
+        if not matches:
+            _LOGGER.debug("Bulk import found no visible unconfigured locks")
+            return self.async_abort(reason="no_devices_found")
 
+        _LOGGER.debug("Bulk import matched %s lock(s)", len(matches))
+        await self._async_save_account_data(account_data)
+        entries = [
+            self._build_entry_data(
+                account_data[CONF_ACCOUNT_ID], user_input, address, lock
+            )
+            for address, lock in matches.items()
+        ]
+
+        # This flow creates the first entry, the others go through the import step.
+        for entry_data in entries[1:]:
+            self.hass.async_create_task(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN,
+                    context={"source": config_entries.SOURCE_IMPORT},
+                    data=entry_data,
+                )
+            )
 
-class YeelockAuthError(YeelockApiError):
-    """Raised when authentication with the Yeelock cloud fails."""
+        await self.async_set_unique_id(entries[0][CONF_MAC], raise_on_progress=False)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=entries[0][CONF_NAME], data=entries[0])
 
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a lock matched by the bulk import."""
+        await self.async_set_unique_id(import_data[CONF_MAC], raise_on_progress=False)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=import_data[CONF_NAME], data=import_data)
 
-class YeelockAccountNotRegisteredError(YeelockAuthError):
-    """Raised when the Yeelock account has not been registered."""
+    async def async_step_user(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the initial step by importing all visible account locks."""
+        return await self.async_step_account_type()
 
 
-class YeelockOptionsFlow(config_entries.OptionsFlowWithReload):
+class YeelockOptionsFlow(config_entries.OptionsFlow):
     """Handle options for Yeelock."""
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
@@ -569,6 +545,40 @@ class YeelockOptionsFlow(config_entries.OptionsFlowWithReload):
                         cv.positive_int,
                         voluptuous.Range(min=1, max=100),
                     ),
+                    voluptuous.Required(
+                        CONF_AUTO_RELOCK_DELAY,
+                        default=self.config_entry.options.get(
+                            CONF_AUTO_RELOCK_DELAY,
+                            self.config_entry.data.get(
+                                CONF_AUTO_RELOCK_DELAY,
+                                DEFAULT_AUTO_RELOCK_DELAY,
+                            ),
+                        ),
+                    ): voluptuous.All(
+                        cv.positive_int,
+                        voluptuous.Range(min=0, max=3600),
+                    ),
+                    voluptuous.Required(
+                        CONF_UNAVAILABLE_AFTER,
+                        default=self.config_entry.options.get(
+                            CONF_UNAVAILABLE_AFTER, DEFAULT_UNAVAILABLE_AFTER
+                        ),
+                    ): voluptuous.All(
+                        cv.positive_int,
+                        voluptuous.Range(min=30, max=86400),
+                    ),
+                    voluptuous.Required(
+                        CONF_OPTIMISTIC,
+                        default=self.config_entry.options.get(
+                            CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC
+                        ),
+                    ): bool,
+                    voluptuous.Required(
+                        CONF_SESSION_TRACE,
+                        default=self.config_entry.options.get(
+                            CONF_SESSION_TRACE, DEFAULT_SESSION_TRACE
+                        ),
+                    ): bool,
                 }
             ),
         )
@@ -10,11 +10,32 @@ PLATFORMS: list[str] = [
 ]
 
 CONF_PHONE = "phone"
+CONF_API_URL = "api_url"
+CONF_ACCOUNT_ID = "account_id"
 CONF_AUTO_UNLOCK_LOW_BATTERY = "auto_unlock_low_battery"
 CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD = "auto_unlock_low_battery_threshold"
+CONF_AUTO_RELOCK_DELAY = "auto_relock_delay"
+CONF_SESSION_TRACE = "session_trace"
+CONF_OPTIMISTIC = "optimistic"
+CONF_UNAVAILABLE_AFTER = "unavailable_after"
 
 DEFAULT_AUTO_UNLOCK_LOW_BATTERY = True
 DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD = 10
+DEFAULT_AUTO_RELOCK_DELAY = 0
+DEFAULT_SESSION_TRACE = False
+DEFAULT_OPTIMISTIC = False
+DEFAULT_UNAVAILABLE_AFTER = 900
+
+TRACE_DIR = f"{DOMAIN}_traces"
+PROFILE_DIR = f"{DOMAIN}_profiles"
+
+SERVICE_PROFILE = "profile"
+ATTR_DURATION = "duration"
+DEFAULT_PROFILE_DURATION = 60
+MAX_PROFILE_DURATION = 600
+
+ACCOUNT_STORE_KEY = f"{DOMAIN}_accounts"
+ACCOUNT_STORE_VERSION = 1
 
 UUID_BATTERY_LEVEL = "00002a19-0000-1000-8000-00805f9b34fb"
 UUID_COMMAND = "58af3dca-6fc0-4fa3-9464-74662f043a3b"
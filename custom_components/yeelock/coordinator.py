@@ -0,0 +1,71 @@
+"""Push coordinator for Yeelock devices."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class YeelockCoordinator:
+    """Hold the state of a single lock and push changes to its entities.
+
+    Entities only read the cached values here, so adding more entities for
+    a lock never causes extra BLE traffic.
+    """
+
+    def __init__(self, mac: str) -> None:
+        """Initialize the coordinator."""
+        self.mac = mac
+        self.lock_state: str | None = None
+        self.battery_level: int | None = None
+        self.available = True
+        self.last_update: datetime | None = None
+        self._listeners: dict[CALLBACK_TYPE, Callable[[], None]] = {}
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Listen for state changes, returning a callable to stop listening."""
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the update listener."""
+            self._listeners.pop(remove_listener, None)
+
+        self._listeners[remove_listener] = update_callback
+        return remove_listener
+
+    @callback
+    def async_set_lock_state(self, lock_state: str) -> None:
+        """Store a new lock state reported by the device."""
+        self.lock_state = lock_state
+        self._async_update_listeners()
+
+    @callback
+    def async_set_battery_level(self, battery_level: int) -> None:
+        """Store a new battery level reported by the device."""
+        self.battery_level = battery_level
+        self._async_update_listeners()
+
+    @callback
+    def async_set_available(self, available: bool) -> None:
+        """Store whether the device can currently be reached."""
+        if self.available == available:
+            return
+        self.available = available
+        self._async_update_listeners()
+
+    @callback
+    def _async_update_listeners(self) -> None:
+        """Notify all listening entities."""
+        self.last_update = dt_util.utcnow()
+        _LOGGER.debug(
+            "Updating %s listener(s) for %s", len(self._listeners), self.mac
+        )
+        for update_callback in list(self._listeners.values()):
+            update_callback()
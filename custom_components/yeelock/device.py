@@ -1,39 +1,132 @@
 """Yeelock device."""
 
+from __future__ import annotations
+
 import asyncio
+import contextlib
 import hashlib
 import hmac
 import logging
-import uuid
-from time import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import AsyncIterator
+from functools import partial
+from time import monotonic, time
+from typing import TYPE_CHECKING
 
-from bleak import BleakClient
 from bleak.exc import BleakError
-from bleak_retry_connector import establish_connection
 from homeassistant.components import bluetooth
-from homeassistant.const import CONF_API_KEY, CONF_MAC, CONF_MODEL, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_MAC,
+    CONF_MODEL,
+    CONF_NAME,
+    CONF_PASSWORD,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_call_later
 
+from .api import (
+    YeelockApiError,
+    YeelockAuthError,
+    build_login_account,
+    find_matching_lock,
+    normalize_identifier,
+)
+from .coordinator import YeelockCoordinator
 from .const import (
+    CONF_ACCOUNT_ID,
+    CONF_AUTO_RELOCK_DELAY,
     CONF_AUTO_UNLOCK_LOW_BATTERY,
     CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
+    CONF_OPTIMISTIC,
+    CONF_SESSION_TRACE,
+    CONF_UNAVAILABLE_AFTER,
+    DEFAULT_AUTO_RELOCK_DELAY,
     DEFAULT_AUTO_UNLOCK_LOW_BATTERY,
     DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_SESSION_TRACE,
+    DEFAULT_UNAVAILABLE_AFTER,
     DOMAIN,
     LOCKER_KIND,
-    UUID_COMMAND,
-    UUID_NOTIFY,
+    TRACE_DIR,
+)
+from .profiler import timed
+from .session_trace import (
+    EVENT_CONNECT,
+    EVENT_DISCONNECT,
+    EVENT_ERROR,
+    EVENT_RX,
+    EVENT_TX,
+    YeelockTraceRecorder,
+    frame_header,
 )
+from .supervisor import YeelockTaskSupervisor
+from .transport import BleakTransport, YeelockTransport
 
+if TYPE_CHECKING:
+    from .manager import YeelockManager
+    from .state_cache import YeelockStateCache
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds an intermediate value is held back before it is written, so that
+# a quick unlocking -> unlocked burst only produces a single state change.
+STATE_SETTLE_WINDOW = 0.5
+
+# Minimum seconds between signing key refreshes from the cloud.
+KEY_REFRESH_COOLDOWN = 900
+
+# Maximum number of decoded notifications waiting for the worker.
+EVENT_QUEUE_SIZE = 32
+
+EVENT_STATE = "state"
+EVENT_TIME_SYNC = "time_sync"
+EVENT_BATTERY = "battery"
+
+# Seconds an optimistic lock state waits for the lock to confirm it.
+OPTIMISTIC_TIMEOUT = 10
+
+# Pending and confirmed lock states for each command.
+OPTIMISTIC_STATES = {
+    "lock": ("locking", "locked"),
+    "unlock": ("unlocking", "unlocked"),
+    "unlock_quick": ("unlocking", "unlocked"),
+}
+CONFIRMED_STATES = ("locked", "unlocked", "jammed")
+
+# Seconds a cached battery level is trusted without asking the lock.
+BATTERY_MAX_AGE = 6 * 3600
+
+# Weight of the newest sample in the average connect time.
+CONNECT_TIME_WEIGHT = 0.2
+
+# Seconds each operation may take in total, covering device lookup, connect,
+# subscribe, write and, for lock commands, the confirming notification.
+OPERATION_BUDGETS = {
+    "lock": 8,
+    "unlock": 8,
+    "unlock_quick": 8,
+    "time_sync": 6,
+    "battery": 6,
+}
+
+# Seconds allowed to tear down a connection after a budget ran out.
+DISCONNECT_TIMEOUT = 2
 
-class YeelockDeviceEntity:
-    """Entity class for the Yeelock devices."""
+
+class YeelockDeviceEntity(ABC):
+    """Entity class for the Yeelock devices.
+
+    Subclasses implement the value hooks; a missing one makes the entity
+    class abstract, so it cannot be created.
+    """
 
     _attr_has_entity_name = True
+    _transient_values: tuple = ()
 
     def __init__(self, yeelock_device, hass: HomeAssistant):
         """Init entity with the device."""
@@ -41,6 +134,87 @@ class YeelockDeviceEntity:
         self.device: Yeelock = yeelock_device
         self._attr_unique_id = f"{yeelock_device.mac}_{self.__class__.__name__}"
         self._last_action = None  # Track last requested action
+        self._cancel_pending_value: CALLBACK_TYPE | None = None
+        self._written_available = True
+
+    @property
+    def available(self) -> bool:
+        """Return true while the lock is advertising."""
+        return self.device.coordinator.available
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to device state pushed by the coordinator."""
+        await super().async_added_to_hass()
+        self._written_available = self.available
+        self.async_on_remove(
+            self.device.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._async_push_value(self._coordinator_value())
+
+    @abstractmethod
+    def _coordinator_value(self):
+        """Return the coordinator value this entity reports."""
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop any value that is still waiting to be written."""
+        self._cancel_pending_write()
+        await super().async_will_remove_from_hass()
+
+    @abstractmethod
+    def _current_value(self):
+        """Return the value currently reported to Home Assistant."""
+
+    @abstractmethod
+    def _set_value(self, value) -> None:
+        """Store a new value on the entity."""
+
+    def _value_changed(self, old, new) -> bool:
+        """Return true if the new value is worth a state write."""
+        return old != new
+
+    @callback
+    def _async_push_value(self, value) -> None:
+        """Write a value to the state machine, skipping redundant updates."""
+        self._cancel_pending_write()
+        if value in self._transient_values:
+            self._cancel_pending_value = async_call_later(
+                self.hass,
+                STATE_SETTLE_WINDOW,
+                partial(self._async_write_pending_value, value),
+            )
+            return
+        self._async_write_value(value)
+
+    @callback
+    def _async_write_pending_value(self, value, _now) -> None:
+        """Write an intermediate value that was not superseded in time."""
+        self._cancel_pending_value = None
+        self._async_write_value(value)
+
+    @callback
+    @timed("state write")
+    def _async_write_value(self, value) -> None:
+        """Store the value and write state if it or availability changed."""
+        available = self.available
+        if (
+            not self._value_changed(self._current_value(), value)
+            and available == self._written_available
+        ):
+            _LOGGER.debug("Skipping unchanged value %s for %s", value, self.entity_id)
+            return
+        self._written_available = available
+        self._set_value(value)
+        self.async_write_ha_state()
+
+    def _cancel_pending_write(self) -> None:
+        """Cancel a held back intermediate value."""
+        if self._cancel_pending_value is not None:
+            self._cancel_pending_value()
+            self._cancel_pending_value = None
 
     @property
     def device_info(self):
@@ -57,23 +231,73 @@ class YeelockDeviceEntity:
 class Yeelock:
     """Yeelock class."""
 
-    def __init__(self, config: dict, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        config: dict,
+        hass: HomeAssistant,
+        entry: ConfigEntry | None = None,
+        manager: YeelockManager | None = None,
+        transport: YeelockTransport | None = None,
+    ) -> None:
         """Initialize device."""
         self._hass = hass
-        self._device = None
-        self._lock = None
-        self._battery_sensor = None
-        self._client = None
-        self._connecting = False
+        self._entry = entry
+        self.entry_id = entry.entry_id if entry is not None else None
+        self._manager = manager
         self._connect_lock = asyncio.Lock()
-        self._connected = False
         self.mac = config.get(CONF_MAC)
+        self._transport = transport or BleakTransport(
+            hass,
+            self.mac,
+            manager.connection_slots if manager is not None else None,
+        )
+        self.coordinator = YeelockCoordinator(self.mac)
+        self.tasks = YeelockTaskSupervisor(hass, f"{DOMAIN} {self.mac}")
+        self.rssi: int | None = None
+        self.source: str | None = None
+        self.last_seen: float | None = None
+        self.last_time_sync: float | None = None
+        self._battery_updated: float | None = None
+        self.link_stats: dict = {
+            "connects": 0,
+            "connect_failures": 0,
+            "connect_time": None,
+        }
+        self._state_cache: YeelockStateCache | None = None
         self.name = config.get(CONF_NAME)
-        self.key = config.get(CONF_API_KEY)
+        self.account_id = config.get(CONF_ACCOUNT_ID)
+        self.key = None
+        self._key_bytes = b""
+        self._set_key(config.get(CONF_API_KEY))
+        self._key_refresh_task: asyncio.Task | None = None
+        self._last_key_refresh: float | None = None
         self.model = config.get(CONF_MODEL, None)
         self.manufacturer = "Yeelock"
-        self.battery_level = None
         self._last_action = None
+        self._auto_unlock_triggered = False
+        self._cancel_relock: CALLBACK_TYPE | None = None
+        self._torn_down = False
+        self._events: deque[tuple[str, object]] = deque()
+        self._events_ready = asyncio.Event()
+        self._event_worker: asyncio.Task | None = None
+        self.events_processed = 0
+        self.events_dropped = 0
+        self._optimistic_previous: str | None = None
+        self._cancel_optimistic: CALLBACK_TYPE | None = None
+        self._pending_ack: asyncio.Future | None = None
+        self.unavailable_after: int | None = None
+        self._cancel_unavailable_tracking: CALLBACK_TYPE | None = None
+        self._cancel_silence_check: CALLBACK_TYPE | None = None
+        self._trace: YeelockTraceRecorder | None = None
+        self.async_apply_options(config)
+
+    @callback
+    def async_apply_options(self, config: dict) -> None:
+        """Apply options, at setup and again whenever they change.
+
+        Changes are applied without dropping the connection. This is the
+        only place options are read, so defaults live here too.
+        """
         self.auto_unlock_low_battery = config.get(
             CONF_AUTO_UNLOCK_LOW_BATTERY,
             DEFAULT_AUTO_UNLOCK_LOW_BATTERY,
@@ -82,13 +306,375 @@ class Yeelock:
             CONF_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
             DEFAULT_AUTO_UNLOCK_LOW_BATTERY_THRESHOLD,
         )
-        self._auto_unlock_triggered = False
+        self.auto_relock_delay = config.get(
+            CONF_AUTO_RELOCK_DELAY,
+            DEFAULT_AUTO_RELOCK_DELAY,
+        )
+        if not self.auto_relock_delay:
+            self._cancel_auto_relock()
+        self.optimistic = config.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC)
+        if not self.optimistic:
+            # Nothing will confirm a pending optimistic state any more.
+            self._end_optimistic(rollback=True)
+        unavailable_after = config.get(
+            CONF_UNAVAILABLE_AFTER,
+            DEFAULT_UNAVAILABLE_AFTER,
+        )
+        if unavailable_after != self.unavailable_after:
+            self.unavailable_after = unavailable_after
+            if self._cancel_unavailable_tracking is not None:
+                bluetooth.async_set_fallback_availability_interval(
+                    self._hass, self.mac, unavailable_after
+                )
+        self._set_session_trace(config.get(CONF_SESSION_TRACE, DEFAULT_SESSION_TRACE))
+        _LOGGER.debug("Applied updated options to %s", self.mac)
+
+    def _set_session_trace(self, enabled: bool) -> None:
+        """Start or stop recording the BLE session trace."""
+        if enabled and self._trace is None:
+            self._trace = YeelockTraceRecorder(
+                self._hass.config.path(
+                    TRACE_DIR, f"{normalize_identifier(self.mac)}.trace"
+                )
+            )
+        elif not enabled and self._trace is not None:
+            self._flush_trace()
+            self._trace = None
+
+    @property
+    def battery_level(self) -> int | None:
+        """Return the last reported battery level."""
+        return self.coordinator.battery_level
+
+    @property
+    def lock_state(self) -> str | None:
+        """Return the last reported lock state."""
+        return self.coordinator.lock_state
+
+    @callback
+    def async_handle_advertisement(
+        self, service_info: bluetooth.BluetoothServiceInfoBleak
+    ) -> None:
+        """Remember the latest advertisement routed here by the manager."""
+        self._transport.update_device(service_info)
+        self.rssi = service_info.rssi
+        self.source = service_info.source
+        self.last_seen = service_info.time
+        self._cancel_pending_silence_check()
+        self.coordinator.async_set_available(True)
+
+    @callback
+    def async_track_presence(self) -> CALLBACK_TYPE:
+        """Mark the lock unavailable once it stops advertising.
+
+        Home Assistant reports the lock as gone once it misses its expected
+        advertisements; the lock is only marked unavailable after it has also
+        been silent for unavailable_after seconds.
+        """
+        bluetooth.async_set_fallback_availability_interval(
+            self._hass, self.mac, self.unavailable_after
+        )
+        self.coordinator.available = bluetooth.async_address_present(
+            self._hass, self.mac, connectable=True
+        )
+        self._cancel_unavailable_tracking = bluetooth.async_track_unavailable(
+            self._hass, self._async_handle_unavailable, self.mac, connectable=True
+        )
+        return self._async_stop_presence_tracking
+
+    @callback
+    def _async_stop_presence_tracking(self) -> None:
+        """Stop tracking advertisements."""
+        self._cancel_pending_silence_check()
+        if self._cancel_unavailable_tracking is not None:
+            self._cancel_unavailable_tracking()
+            self._cancel_unavailable_tracking = None
+
+    @callback
+    def _async_handle_unavailable(
+        self, service_info: bluetooth.BluetoothServiceInfoBleak
+    ) -> None:
+        """Handle Home Assistant no longer seeing the lock."""
+        _LOGGER.debug("%s is no longer advertising", self.mac)
+        # The history is dropped before this runs; keep its last time.
+        self.last_seen = service_info.time
+        self._async_check_silence()
+
+    @callback
+    def _async_last_seen(self) -> float | None:
+        """Return when the lock last advertised, in monotonic time.
+
+        Routed callbacks are skipped for unchanged advertisements, so the
+        bluetooth integration's history is the authoritative source.
+        """
+        service_info = bluetooth.async_last_service_info(
+            self._hass, self.mac, connectable=True
+        )
+        if service_info is not None:
+            self.last_seen = service_info.time
+        return self.last_seen
+
+    @callback
+    def _async_check_silence(self, _now=None) -> None:
+        """Mark the lock unavailable if it has been silent long enough."""
+        self._cancel_silence_check = None
+        if self._transport.is_connected:
+            # Locks stop advertising while connected.
+            remaining = self.unavailable_after
+        elif (last_seen := self._async_last_seen()) is None:
+            remaining = 0
+        else:
+            remaining = self.unavailable_after - (monotonic() - last_seen)
+        if remaining > 0:
+            self._cancel_silence_check = async_call_later(
+                self._hass, remaining, self._async_check_silence
+            )
+            return
+        _LOGGER.info("%s has not been seen for a while, marking unavailable", self.mac)
+        self.coordinator.async_set_available(False)
+
+    @callback
+    def _cancel_pending_silence_check(self) -> None:
+        """Cancel a scheduled silence check."""
+        if self._cancel_silence_check is not None:
+            self._cancel_silence_check()
+            self._cancel_silence_check = None
+
+    @callback
+    def async_restore_state(self, state_cache: YeelockStateCache) -> None:
+        """Fill in the last known state before the entities are added."""
+        self._state_cache = state_cache
+        data = state_cache.data
+        self.coordinator.lock_state = data.get("lock_state")
+        self.coordinator.battery_level = data.get("battery_level")
+        self._battery_updated = data.get("battery_updated")
+        self.last_time_sync = data.get("last_time_sync")
+        self.link_stats.update(data.get("link", {}))
+
+    def _save_state(self, **changes) -> None:
+        """Write changes to the state cache, if there is one."""
+        if self._state_cache is not None:
+            self._state_cache.async_update(**changes)
+
+    @property
+    def battery_is_fresh(self) -> bool:
+        """Return true if the known battery level is recent enough to trust."""
+        return (
+            self.battery_level is not None
+            and self._battery_updated is not None
+            and time() - self._battery_updated < BATTERY_MAX_AGE
+        )
+
+    def diagnostics(self) -> dict:
+        """Return runtime state for the diagnostics download."""
+        return {
+            "lock_state": self.lock_state,
+            "battery_level": self.battery_level,
+            "battery_is_fresh": self.battery_is_fresh,
+            "connected": self._transport.is_connected,
+            "transport": self._transport.name,
+            "rssi": self.rssi,
+            "source": self.source,
+            "seconds_since_seen": (
+                monotonic() - last_seen
+                if (last_seen := self._async_last_seen()) is not None
+                else None
+            ),
+            "last_time_sync": self.last_time_sync,
+            "link": self.link_stats,
+            "events": {
+                "queued": self.event_queue_depth,
+                "processed": self.events_processed,
+                "dropped": self.events_dropped,
+            },
+            "available": self.coordinator.available,
+            "unavailable_after": self.unavailable_after,
+            "optimistic": self.optimistic,
+            "auto_relock_delay": self.auto_relock_delay,
+            "session_trace": self._trace is not None,
+            "tasks": self.tasks.diagnostics(),
+        }
+
+    def _update_link_stats(self, connect_time: float | None) -> None:
+        """Track connect attempts and a moving average of connect time."""
+        stats = self.link_stats
+        if connect_time is None:
+            stats["connect_failures"] += 1
+        else:
+            stats["connects"] += 1
+            if stats["connect_time"] is None:
+                stats["connect_time"] = connect_time
+            else:
+                stats["connect_time"] += CONNECT_TIME_WEIGHT * (
+                    connect_time - stats["connect_time"]
+                )
+            stats["source"] = self.source
+            stats["rssi"] = self.rssi
+        self._save_state(link=dict(stats))
+
+    def _record(self, event: int, payload: bytes = b"") -> None:
+        """Add an event to the session trace when tracing is enabled."""
+        if self._trace is not None and self._trace.record(event, payload):
+            self._flush_trace()
+
+    def _flush_trace(self) -> None:
+        """Write buffered trace records from the executor."""
+        if self._trace is not None:
+            self._hass.async_add_executor_job(self._trace.write, self._trace.take())
+
+    def _record_error(self, error: Exception) -> None:
+        """Add an error to the session trace."""
+        self._record(EVENT_ERROR, str(error).encode(errors="replace"))
+
+    async def _write_command(self, frame: bytes) -> None:
+        """Write a signed frame to the command characteristic."""
+        self._record(EVENT_TX, frame_header(frame))
+        await self._transport.write(frame)
+
+    def _ack_future(self) -> asyncio.Future:
+        """Return the future resolved by the next lock confirmation.
+
+        A command retried after a time sync shares the future of the first
+        attempt, so both waiters are released by the same notification.
+        """
+        if self._pending_ack is None or self._pending_ack.done():
+            self._pending_ack = self._hass.loop.create_future()
+            # Nobody may be waiting any more when a timeout is set.
+            self._pending_ack.add_done_callback(
+                lambda future: future.cancelled() or future.exception()
+            )
+        return self._pending_ack
+
+    @property
+    def _ack_pending(self) -> bool:
+        """Return true while a lock command waits for confirmation."""
+        return self._pending_ack is not None and not self._pending_ack.done()
+
+    def _resolve_ack(self, state: str) -> None:
+        """Release whoever waits for the lock to confirm a command."""
+        if self._pending_ack is not None and not self._pending_ack.done():
+            self._pending_ack.set_result(state)
+
+    def _fail_pending_acks(self) -> None:
+        """Resolve pending confirmations with a timeout."""
+        if self._pending_ack is not None and not self._pending_ack.done():
+            self._pending_ack.set_exception(TimeoutError())
+
+    @contextlib.asynccontextmanager
+    async def _deadline(
+        self, operation: str, owns_ack: bool = False
+    ) -> AsyncIterator[None]:
+        """Run an operation within its budget, tearing down on expiry.
+
+        Only the operation waiting for the lock confirmation may fail it. The
+        link is left alone if another operation is still waiting for one.
+        """
+        budget = OPERATION_BUDGETS[operation]
+        deadline = asyncio.timeout(budget)
+        try:
+            async with deadline:
+                yield
+        except TimeoutError:
+            if not deadline.expired():
+                # Raised inside the operation, e.g. by a failed confirmation.
+                raise
+            _LOGGER.warning(
+                "%s on %s did not finish within %s seconds", operation, self.mac, budget
+            )
+            self._record_error(TimeoutError(f"{operation} timed out"))
+            if owns_ack or not self._ack_pending:
+                self._fail_pending_acks()
+                await self._async_teardown()
+            raise
+
+    async def _async_teardown(self) -> None:
+        """Drop the connection so the next operation starts clean."""
+        if not self._transport.is_connected:
+            return
+        # The link was dropped on purpose, do not reconnect to keep it warm.
+        self._torn_down = True
+        try:
+            async with asyncio.timeout(DISCONNECT_TIMEOUT):
+                await self._transport.disconnect()
+        except (BleakError, TimeoutError) as error:
+            _LOGGER.debug("Error tearing down connection to %s: %s", self.mac, error)
+
+    def _set_key(self, key: str | None) -> None:
+        """Store the signing key and its decoded form."""
+        self.key = key
+        self._key_bytes = bytes.fromhex(key) if key else b""
 
     async def disconnect(self):
         """Disconnect from the device."""
         _LOGGER.debug("Disconnected from %s", self.mac)
-        if (self._client is not None) and self._client.is_connected:
-            await self._client.disconnect()
+        self._cancel_auto_relock()
+        self._end_optimistic()
+        self._fail_pending_acks()
+        if self._event_worker is not None:
+            self._event_worker.cancel()
+            self._event_worker = None
+        await self._transport.disconnect()
+        self._flush_trace()
+
+    def _handle_disconnect(self) -> None:
+        """Re-establish the link while a relock is pending."""
+        _LOGGER.debug("Connection to %s was closed", self.mac)
+        self._record(EVENT_DISCONNECT)
+        if self._torn_down:
+            self._torn_down = False
+            return
+        if self._cancel_relock is not None:
+            _LOGGER.debug("Relock pending for %s, keeping the link warm", self.mac)
+            self.tasks.async_create_task(
+                self._reconnect_for_relock(), "relock reconnect"
+            )
+
+    async def _reconnect_for_relock(self) -> None:
+        """Reconnect so the pending relock only needs a single write."""
+        try:
+            await self._connect()
+        except BleakError as error:
+            _LOGGER.debug("Unable to keep %s connected for relock: %s", self.mac, error)
+
+    def _arm_auto_relock(self) -> None:
+        """Start the relock timer after the lock reports it is unlocked."""
+        self._cancel_auto_relock()
+        if not self.auto_relock_delay:
+            return
+        if self._auto_unlock_triggered:
+            # Keep the lock open after a low battery unlock.
+            return
+        _LOGGER.debug(
+            "Relocking %s in %s seconds", self.mac, self.auto_relock_delay
+        )
+        self._cancel_relock = async_call_later(
+            self._hass, self.auto_relock_delay, self._async_auto_relock
+        )
+
+    def _cancel_auto_relock(self) -> None:
+        """Cancel a pending relock timer."""
+        if self._cancel_relock is not None:
+            self._cancel_relock()
+            self._cancel_relock = None
+
+    @callback
+    def _async_auto_relock(self, _now) -> None:
+        """Send the lock frame once the relock timer fires."""
+        self._cancel_relock = None
+        self.tasks.async_create_task(
+            self._async_run_auto_relock(), "auto relock", limited=False
+        )
+
+    async def _async_run_auto_relock(self) -> None:
+        """Lock the device, logging instead of raising if it fails."""
+        _LOGGER.debug("Auto relocking %s", self.mac)
+        try:
+            confirmed = await self.locker("lock")
+        except BleakError as error:
+            _LOGGER.warning("Unable to relock %s: %s", self.mac, error)
+            return
+        if not confirmed:
+            _LOGGER.warning("%s did not confirm the relock", self.mac)
 
     async def _connect(self):
         """Connect to the device.
@@ -96,83 +682,89 @@ class Yeelock:
         :raises BleakError: if the device is not found
         """
         async with self._connect_lock:
-            if self._client is not None and self._client.is_connected:
+            if self._transport.is_connected:
                 return
 
-            self._connecting = True
+            if not self.coordinator.available:
+                raise BleakError(f"{self.mac} is not advertising")
+
             try:
-                self._device = bluetooth.async_ble_device_from_address(
-                    self._hass, self.mac, connectable=True
-                )
-                if not self._device:
-                    raise BleakError(
-                        f"A device with address {self.mac} could not be found."
-                    )
                 _LOGGER.debug("Connecting to %s", self.mac)
-                self._client = await establish_connection(
-                    BleakClient,
-                    self._device,
-                    self.mac,
-                    max_attempts=3,
+                connect_start = monotonic()
+                self._torn_down = False
+                await self._transport.connect(self._handle_disconnect)
+                _LOGGER.debug(
+                    "Connected to %s over %s", self.mac, self._transport.name
                 )
-                _LOGGER.debug("Connected to %s", self.mac)
-                await self._client.start_notify(
-                    uuid.UUID(UUID_NOTIFY), self._handle_data
+                connect_time = monotonic() - connect_start
+                self._update_link_stats(connect_time)
+                self._record(
+                    EVENT_CONNECT, int(connect_time * 1000).to_bytes(4, "little")
                 )
+                await self._transport.subscribe(self._handle_data)
                 _LOGGER.debug("Listening for notifications from %s", self.mac)
-            finally:
-                self._connecting = False
+            except BleakError as error:
+                self._update_link_stats(None)
+                self._record_error(error)
+                raise
+
+    @timed("notification")
+    def _handle_data(self, sender, value) -> None:
+        """Decode a notification and queue it for processing.
 
-    async def _handle_data(self, sender, value):
-        """Handle data notifications."""
+        This runs as the bleak notification callback, so it must not wait on
+        any BLE work. Anything that needs to await is handed to the worker.
+        """
         _LOGGER.debug("Received notification from %s (len=%s)", sender, len(value))
+        self._record(EVENT_RX, value)
         if not value:
             _LOGGER.warning("Received empty notification from %s", sender)
             return
-        new_state = None
         first_byte = value[0]
 
         # Lock change successes
         # Unlocking
         if first_byte == 0x2:
-            new_state = "unlocking"
+            self._enqueue_event(EVENT_STATE, "unlocking")
 
         # Unlocked
         elif first_byte == 0x3:
-            new_state = "unlocked"
+            self._last_action = None
+            self._resolve_ack("unlocked")
+            self._arm_auto_relock()
+            self._enqueue_event(EVENT_STATE, "unlocked")
 
         # Locking
         elif first_byte == 0x4:
-            new_state = "locking"
+            self._cancel_auto_relock()
+            self._enqueue_event(EVENT_STATE, "locking")
 
         # Locked
         elif first_byte == 0x5:
-            new_state = "locked"
+            self._last_action = None
+            self._resolve_ack("locked")
+            self._cancel_auto_relock()
+            self._enqueue_event(EVENT_STATE, "locked")
 
         # Lock change failures
         # Invalid signing key
         elif first_byte == 0xFF:
             _LOGGER.error("Invalid signing key")
-            new_state = "jammed"
+            self._resolve_ack("jammed")
+            self._cancel_auto_relock()
+            self._schedule_key_refresh()
+            self._enqueue_event(EVENT_STATE, "jammed")
 
         # Time needs to be synced
         elif first_byte == 0x9:
             _LOGGER.info("Lock reported time drift; syncing time")
-            await self.time_sync()
-            if self._last_action:
-                _LOGGER.debug("Retrying last action after time sync: %s", self._last_action)
-                await self.locker(self._last_action)
-                self._last_action = None
+            self._enqueue_event(EVENT_TIME_SYNC, None)
 
         # Battery response notification
         elif first_byte == 0x7:
             if len(value) > 6:
-                self.battery_level = value[6]
-                _LOGGER.debug("Received battery level: %s%%", self.battery_level)
-                if self._battery_sensor is not None:
-                    await self._battery_sensor._update_battery_level(self.battery_level)
-
-                await self._maybe_auto_unlock_low_battery()
+                _LOGGER.debug("Received battery level: %s%%", value[6])
+                self._enqueue_event(EVENT_BATTERY, value[6])
             else:
                 _LOGGER.warning(
                     "Battery notification too short (len=%s) from %s",
@@ -184,12 +776,113 @@ class Yeelock:
         else:
             _LOGGER.warning("Unknown notification received (0x%02x)", first_byte)
 
-        # Update to the new lock state, if we have one
-        if new_state is not None:
-            _LOGGER.debug("Notified of %s", new_state)
-            if self._lock is not None:
-                await self._lock._update_lock_state(new_state)
+    @property
+    def event_queue_depth(self) -> int:
+        """Return the number of notifications waiting to be processed."""
+        return len(self._events)
+
+    @staticmethod
+    def _event_is_stale(kind: str, data) -> bool:
+        """Return true for events a later one makes redundant."""
+        return kind == EVENT_BATTERY or (
+            kind == EVENT_STATE and data not in CONFIRMED_STATES
+        )
+
+    def _enqueue_event(self, kind: str, data) -> None:
+        """Queue a decoded notification, making room when full.
+
+        A pending time sync absorbs later ones. When the queue is full,
+        battery readings and intermediate states go first, then confirmed
+        states that a newer state supersedes, so the latest confirmed state
+        and a pending time sync are never lost.
+        """
+        if kind == EVENT_TIME_SYNC and (EVENT_TIME_SYNC, None) in self._events:
+            _LOGGER.debug("Time sync for %s is already queued", self.mac)
+            return
+        if len(self._events) >= EVENT_QUEUE_SIZE:
+            dropped_kind = self._make_room(kind, data)
+            self.events_dropped += 1
+            _LOGGER.warning(
+                "Notification queue for %s is full, dropped %s event (%s dropped)",
+                self.mac,
+                dropped_kind,
+                self.events_dropped,
+            )
+            if dropped_kind is None:
+                return
+        self._events.append((kind, data))
+        self._events_ready.set()
+        if len(self._events) > 1:
+            _LOGGER.debug(
+                "Notification queue depth for %s is %s", self.mac, len(self._events)
+            )
+        if self._event_worker is None or self._event_worker.done():
+            self._event_worker = self.tasks.async_create_task(
+                self._async_process_events(), "notifications", limited=False
+            )
+
+    def _make_room(self, kind: str, data) -> str | None:
+        """Drop one queued event, returning its kind, or None to skip the new one."""
+        for index, (queued_kind, queued_data) in enumerate(self._events):
+            if self._event_is_stale(queued_kind, queued_data):
+                del self._events[index]
+                return queued_kind
+        if self._event_is_stale(kind, data):
+            return None
+        # Only confirmed states and at most one time sync are left, so the
+        # oldest state is superseded by a newer one.
+        for index, (queued_kind, _) in enumerate(self._events):
+            if queued_kind == EVENT_STATE:
+                del self._events[index]
+                return queued_kind
+        return None
+
+    async def _async_process_events(self) -> None:
+        """Process queued notifications one at a time, in arrival order.
+
+        An event is only started once the previous one has finished, so a
+        time sync retry completes before any later state change is applied.
+        """
+        while True:
+            if not self._events:
+                self._events_ready.clear()
+                await self._events_ready.wait()
+                continue
+            kind, data = self._events.popleft()
+            try:
+                await self._async_handle_event(kind, data)
+            except Exception:
+                _LOGGER.exception(
+                    "Error processing %s notification from %s", kind, self.mac
+                )
+            finally:
+                self.events_processed += 1
+
+    async def _async_handle_event(self, kind: str, data) -> None:
+        """Apply a decoded notification."""
+        if kind == EVENT_STATE:
+            if data in CONFIRMED_STATES:
+                self._end_optimistic()
+            _LOGGER.debug("Notified of %s", data)
+            self.coordinator.async_set_lock_state(data)
+            if data in CONFIRMED_STATES:
+                self._save_state(lock_state=data)
+
+        elif kind == EVENT_TIME_SYNC:
+            # Only retry a command whose caller is still waiting for it.
+            retry = self._last_action if self._ack_pending else None
+            if await self.time_sync() and retry and self._ack_pending:
+                _LOGGER.debug("Retrying last action after time sync: %s", retry)
+                await self.locker(retry)
+                self._last_action = None
+
+        elif kind == EVENT_BATTERY:
+            self._battery_updated = time()
+            self.coordinator.async_set_battery_level(data)
+            self._save_state(battery_level=data, battery_updated=self._battery_updated)
+            await self._maybe_auto_unlock_low_battery()
 
+    @timed("signing")
     def _encrypt_command(
         self, command: int, admin_identification_mode: int, payload: bytes = b""
     ) -> bytes:
@@ -198,7 +891,7 @@ class Yeelock:
         The protocol frames are 20 bytes long and include:
         command + admin mode + timestamp + optional payload + HMAC-SHA1 fragment.
         """
-        key = bytearray.fromhex(self.key)
+        key = self._key_bytes
         timestamp = int(time())
 
         message = (
@@ -235,50 +928,199 @@ class Yeelock:
         _LOGGER.debug("Prepared battery request command payload")
         return output_value
 
-    async def locker(self, kind) -> None:
-        """Lock, unlock and quick unlock the device."""
-        self._last_action = kind  # Save action before attempting
-        await self._connect()
-        try:
-            _LOGGER.debug("Locking")
-            await self._client.write_gatt_char(
-                uuid.UUID(UUID_COMMAND), bytearray(self._encrypt(LOCKER_KIND[kind]))
+    def _schedule_key_refresh(self) -> None:
+        """Fetch a new signing key in the background, rate limited."""
+        if self._key_refresh_task is not None and not self._key_refresh_task.done():
+            return
+        now = monotonic()
+        if (
+            self._last_key_refresh is not None
+            and now - self._last_key_refresh < KEY_REFRESH_COOLDOWN
+        ):
+            _LOGGER.debug("Signing key for %s was refreshed recently, skipping", self.mac)
+            return
+        self._last_key_refresh = now
+        self._key_refresh_task = self.tasks.async_create_task(
+            self._async_refresh_key(), "key refresh"
+        )
+
+    async def _async_refresh_key(self) -> None:
+        """Replace the signing key with the one from the cloud device list."""
+        if self._entry is None or self._manager is None or not self.account_id:
+            _LOGGER.warning(
+                "Cannot refresh signing key for %s: no saved Yeelock account", self.mac
             )
-        except BleakError as error:
-            self._connected = False
-            _LOGGER.error("BleakError: %s", error)
-        finally:
-            # Refresh battery after lock activity when the battery entity exists.
-            if self._battery_sensor is not None:
-                await self.update_battery()
-
-    async def time_sync(self) -> None:
-        """Time sync and retry."""
-        await self._connect()
+            return
+
+        account = await self._manager.async_get_account(self.account_id)
+        if account is None:
+            _LOGGER.warning(
+                "Cannot refresh signing key for %s: account %s is not saved",
+                self.mac,
+                self.account_id,
+            )
+            return
+
+        client = self._manager.api_client
+        service_info = bluetooth.async_last_service_info(
+            self._hass, self.mac, connectable=True
+        )
         try:
-            # Sync the time
-            _LOGGER.debug("Time sync start")
-            await self._client.write_gatt_char(
-                uuid.UUID(UUID_COMMAND), bytearray(self._encrypt_time())
+            token = await client.async_login(
+                build_login_account(account), account[CONF_PASSWORD]
+            )
+            locks = await client.async_get_devices(token)
+        except YeelockAuthError as error:
+            # The saved password may have changed since it was cached.
+            self._manager.async_invalidate_accounts()
+            _LOGGER.warning("Unable to refresh signing key for %s: %s", self.mac, error)
+            return
+        except YeelockApiError as error:
+            _LOGGER.warning("Unable to refresh signing key for %s: %s", self.mac, error)
+            return
+
+        lock = find_matching_lock(
+            locks, self.mac, service_info.name if service_info else None
+        )
+        if not lock or not lock.get("ble_sign_key"):
+            _LOGGER.warning("Lock %s was not found in the Yeelock cloud", self.mac)
+            return
+        if lock["ble_sign_key"] == self.key:
+            _LOGGER.warning("Cloud signing key for %s has not changed", self.mac)
+            return
+
+        _LOGGER.info("Updated signing key for %s from the Yeelock cloud", self.mac)
+        self._set_key(lock["ble_sign_key"])
+        self._hass.config_entries.async_update_entry(
+            self._entry, data={**self._entry.data, CONF_API_KEY: self.key}
+        )
+
+        # The rejected command's caller has usually given up by now; only
+        # retry a command that is still waiting for its confirmation.
+        if self._last_action and self._ack_pending:
+            _LOGGER.debug("Retrying last action with new key: %s", self._last_action)
+            await self.locker(self._last_action)
+        else:
+            _LOGGER.debug(
+                "No command waiting for %s, not retrying with the new key", self.mac
             )
+
+    def _begin_optimistic(self, kind) -> None:
+        """Report the pending state right away and wait for confirmation."""
+        if self._cancel_optimistic is None:
+            self._optimistic_previous = self.lock_state
+        else:
+            self._cancel_optimistic()
+        self._cancel_optimistic = async_call_later(
+            self._hass, OPTIMISTIC_TIMEOUT, self._async_optimistic_timeout
+        )
+        self.coordinator.async_set_lock_state(OPTIMISTIC_STATES[kind][0])
+
+    def _end_optimistic(self, rollback: bool = False) -> None:
+        """Stop waiting for confirmation, optionally restoring the last state."""
+        if self._cancel_optimistic is None:
+            return
+        self._cancel_optimistic()
+        self._cancel_optimistic = None
+        if rollback:
+            self._rollback_optimistic()
+
+    @callback
+    def _async_optimistic_timeout(self, _now) -> None:
+        """Roll back when the lock did not confirm the command in time."""
+        self._cancel_optimistic = None
+        _LOGGER.warning(
+            "%s did not confirm the command within %s seconds",
+            self.mac,
+            OPTIMISTIC_TIMEOUT,
+        )
+        self._rollback_optimistic()
+
+    def _rollback_optimistic(self) -> None:
+        """Restore the last confirmed state, or jammed if it is unknown."""
+        previous = self._optimistic_previous
+        if previous not in CONFIRMED_STATES:
+            previous = "jammed"
+        self.coordinator.async_set_lock_state(previous)
+
+    async def locker(self, kind) -> bool:
+        """Lock, unlock and quick unlock the device.
+
+        Connecting, writing and waiting for the lock to confirm all share the
+        budget for the command. Returns false if the lock did not confirm it
+        or rejected it.
+        """
+        self._cancel_auto_relock()
+        self._last_action = kind  # Save action before attempting
+        if self.optimistic:
+            self._begin_optimistic(kind)
+        try:
+            async with self._deadline(kind, owns_ack=True):
+                try:
+                    await self._connect()
+                except BleakError:
+                    self._last_action = None
+                    self._end_optimistic(rollback=True)
+                    raise
+                ack = self._ack_future()
+                try:
+                    _LOGGER.debug("Locking")
+                    await self._write_command(self._encrypt(LOCKER_KIND[kind]))
+                except BleakError as error:
+                    self._last_action = None
+                    self._record_error(error)
+                    self._end_optimistic(rollback=True)
+                    _LOGGER.error("BleakError: %s", error)
+                    return False
+                if await asyncio.shield(ack) == "jammed":
+                    # Rejected, e.g. because the signing key is invalid.
+                    self._last_action = None
+                    return False
+        except TimeoutError:
+            self._last_action = None
+            self._end_optimistic(rollback=True)
+            return False
+
+        # Refresh battery after lock activity.
+        await self.update_battery()
+        return True
+
+    async def time_sync(self) -> bool:
+        """Sync the lock clock, returning false if it failed."""
+        try:
+            async with self._deadline("time_sync"):
+                await self._connect()
+                # Sync the time
+                _LOGGER.debug("Time sync start")
+                await self._write_command(self._encrypt_time())
+                self.last_time_sync = time()
+                self._save_state(last_time_sync=self.last_time_sync)
+        except TimeoutError:
+            return False
         except BleakError as error:
-            self._connected = False
+            self._record_error(error)
             _LOGGER.error("BleakError: %s", error)
+            return False
+        return True
 
-    async def update_battery(self) -> None:
-        """Request battery level from the lock over BLE."""
+    async def update_battery(self) -> bool:
+        """Request battery level from the lock, returning false on failure."""
         try:
-            await self._connect()
-            _LOGGER.debug("Requesting battery level")
-            await self._client.write_gatt_char(
-                uuid.UUID(UUID_COMMAND), bytearray(self._encrypt_battery())
-            )
+            async with self._deadline("battery"):
+                await self._connect()
+                _LOGGER.debug("Requesting battery level")
+                await self._write_command(self._encrypt_battery())
+        except TimeoutError:
+            return False
         except BleakError as error:
-            self._connected = False
+            self._record_error(error)
             _LOGGER.error("BleakError: %s", error)
+            return False
         except Exception as error:  # pragma: no cover - backend-specific transient failures
-            self._connected = False
+            self._record_error(error)
             _LOGGER.warning("Unable to update battery for %s: %s", self.mac, error)
+            return False
+        return True
 
     async def _maybe_auto_unlock_low_battery(self) -> None:
         """Unlock the lock automatically when battery is critically low."""
@@ -296,7 +1138,7 @@ class Yeelock:
         if self._auto_unlock_triggered:
             return
 
-        if self._lock is not None and not self._lock.is_locked:
+        if self.lock_state is not None and self.lock_state != "locked":
             self._auto_unlock_triggered = True
             return
 
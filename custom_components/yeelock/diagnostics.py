@@ -0,0 +1,29 @@
+"""Diagnostics support for Yeelock."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY, CONF_MAC, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ACCOUNT_ID, CONF_PHONE, DOMAIN
+from .manager import YeelockManager
+
+TO_REDACT = {CONF_API_KEY, CONF_PASSWORD, CONF_PHONE, CONF_ACCOUNT_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    manager: YeelockManager = hass.data[DOMAIN]
+    device = manager.async_get_device(entry.data[CONF_MAC])
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "device": device.diagnostics() if device is not None else None,
+        "cloud_requests": manager.api_client.stats,
+        "profile": manager.profiler.last_summary,
+    }
@@ -2,9 +2,12 @@
 
 import logging
 
+from bleak.exc import BleakError
 from homeassistant.components.lock import LockEntity, LockEntityFeature
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_MAC
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
 
@@ -14,15 +17,16 @@ from .device import Yeelock, YeelockDeviceEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Restored states that describe the lock, not unavailable or unknown.
+RESTORABLE_STATES = ("locked", "unlocked", "jammed", "locking", "unlocking")
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     """Set up the Yeelock lock platform."""
-    device: Yeelock = hass.data[DOMAIN][entry.unique_id]
-    lock = YeelockLock(device, hass)
-    device._lock = lock  # Pass the reference
-    async_add_entities([lock])
+    device: Yeelock = hass.data[DOMAIN].async_get_device(entry.data[CONF_MAC])
+    async_add_entities([YeelockLock(device, hass)])
     return True
 
 
@@ -32,12 +36,24 @@ class YeelockLock(YeelockDeviceEntity, LockEntity, RestoreEntity):
     _attr_name = "Lock"
     _attr_supported_features = LockEntityFeature.OPEN
 
+    @property
+    def _transient_values(self) -> tuple:
+        """Hold back intermediate states unless they are shown optimistically."""
+        if self.device.optimistic:
+            return ()
+        return ("locking", "unlocking")
+
     async def async_added_to_hass(self):
         """Call when entity is added to hass."""
         await super().async_added_to_hass()
-        state = await self.async_get_last_state()
-        if state:
+        if self.device.lock_state is not None:
+            self._attr_state = self.device.lock_state
+        elif (
+            state := await self.async_get_last_state()
+        ) and state.state in RESTORABLE_STATES:
             self._attr_state = state.state
+            # Seed the device so low battery handling knows the last state.
+            self.device.coordinator.lock_state = state.state
 
     @property
     def is_locking(self):
@@ -59,20 +75,39 @@ class YeelockLock(YeelockDeviceEntity, LockEntity, RestoreEntity):
         """Return true if lock is locked."""
         return self._attr_state == "locked"
 
-    async def _update_lock_state(self, new_state):
-        """Update the lock state."""
-        _LOGGER.debug("Setting state to %s", new_state)
-        self._attr_state = new_state
-        self.async_write_ha_state()
+    def _coordinator_value(self):
+        """Return the lock state held by the coordinator."""
+        return self.device.lock_state
+
+    def _current_value(self):
+        """Return the lock state reported to Home Assistant."""
+        return self._attr_state
+
+    def _set_value(self, value) -> None:
+        """Store the new lock state."""
+        self._attr_state = value
+
+    async def _async_locker(self, kind: str) -> None:
+        """Send a command and fail the service call if it is not confirmed."""
+        try:
+            confirmed = await self.device.locker(kind)
+        except BleakError as error:
+            raise HomeAssistantError(
+                f"Unable to connect to {self.device.name}: {error}"
+            ) from error
+        if not confirmed:
+            raise HomeAssistantError(
+                f"{self.device.name} did not confirm the {kind} command"
+            )
 
     async def async_lock(self):
         """Asynchronously lock."""
-        await self.device.locker("lock")
+        await self._async_locker("lock")
 
     async def async_unlock(self):
         """Asynchronously unlock."""
-        await self.device.locker("unlock")
+        await self._async_locker("unlock")
 
     async def async_open(self):
         """Open the door quickly."""
-        await self.device.locker("unlock_quick")
+        await self._async_locker("unlock_quick")
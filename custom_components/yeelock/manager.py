@@ -0,0 +1,156 @@
+"""Domain-wide manager for Yeelock devices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.components import bluetooth
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.loader import async_get_integration
+
+from .api import API_BASE_URL, YeelockApiClient, normalize_identifier
+from .const import ACCOUNT_STORE_KEY, ACCOUNT_STORE_VERSION, CONF_ACCOUNT_ID, DOMAIN
+from .device import Yeelock
+from .profiler import YeelockProfiler
+from .state_cache import YeelockStateCache
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of locks connecting at the same time across all adapters.
+MAX_CONCURRENT_CONNECTIONS = 3
+
+
+class YeelockManager:
+    """Track every configured lock and the resources they share.
+
+    Devices are indexed by normalised MAC so advertisements are routed to
+    their lock with a single dictionary lookup.
+    """
+
+    def __init__(self, hass: HomeAssistant, api_url: str = API_BASE_URL) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self._api_url = api_url
+        self.devices: dict[str, Yeelock] = {}
+        self.connection_slots = asyncio.Semaphore(MAX_CONCURRENT_CONNECTIONS)
+        self.profiler = YeelockProfiler(hass)
+        self._state_caches: dict[str, YeelockStateCache] = {}
+        self._api_client: YeelockApiClient | None = None
+        self._accounts: dict[str, dict[str, Any]] | None = None
+        self._matchers: list[bluetooth.BluetoothCallbackMatcher] = []
+        self._cancel_callbacks: list[CALLBACK_TYPE] = []
+
+    async def async_setup(self) -> None:
+        """Load the bluetooth matchers from the integration manifest."""
+        integration = await async_get_integration(self.hass, DOMAIN)
+        self._matchers = [
+            bluetooth.BluetoothCallbackMatcher(**matcher)
+            for matcher in integration.manifest.get("bluetooth", [])
+        ]
+        if self.devices:
+            self._async_register_callbacks()
+
+    @property
+    def api_client(self) -> YeelockApiClient:
+        """Return the cloud client shared by all locks."""
+        if self._api_client is None:
+            self._api_client = YeelockApiClient(
+                async_get_clientsession(self.hass), self._api_url
+            )
+        return self._api_client
+
+    async def async_get_account(self, account_id: str) -> dict[str, Any] | None:
+        """Return a saved cloud account, loading the account store once."""
+        if self._accounts is None or account_id not in self._accounts:
+            store = Store[dict[str, Any]](
+                self.hass, ACCOUNT_STORE_VERSION, ACCOUNT_STORE_KEY
+            )
+            stored_data = await store.async_load() or {}
+            self._accounts = {
+                account[CONF_ACCOUNT_ID]: account
+                for account in stored_data.get("accounts", [])
+                if account.get(CONF_ACCOUNT_ID)
+            }
+        return self._accounts.get(account_id)
+
+    @callback
+    def async_invalidate_accounts(self) -> None:
+        """Drop cached accounts after the account store changed."""
+        self._accounts = None
+
+    @callback
+    def async_get_state_cache(self, entry_id: str) -> YeelockStateCache:
+        """Return the state cache of an entry, reused across reloads."""
+        if (state_cache := self._state_caches.get(entry_id)) is None:
+            state_cache = self._state_caches[entry_id] = YeelockStateCache(
+                self.hass, entry_id
+            )
+        return state_cache
+
+    @callback
+    def async_pop_state_cache(self, entry_id: str) -> YeelockStateCache:
+        """Return the state cache of an entry that is being removed."""
+        return self._state_caches.pop(entry_id, None) or YeelockStateCache(
+            self.hass, entry_id
+        )
+
+    @callback
+    def async_get_device(self, address: str) -> Yeelock | None:
+        """Return the device for a bluetooth address."""
+        return self.devices.get(normalize_identifier(address))
+
+    @callback
+    def async_get_entry_device(self, entry_id: str) -> Yeelock | None:
+        """Return the device set up for a config entry."""
+        return next(
+            (
+                device
+                for device in self.devices.values()
+                if device.entry_id == entry_id
+            ),
+            None,
+        )
+
+    @callback
+    def async_add_device(self, device: Yeelock) -> None:
+        """Start routing advertisements to a device."""
+        self.devices[normalize_identifier(device.mac)] = device
+        self._async_register_callbacks()
+
+    @callback
+    def async_remove_device(self, device: Yeelock) -> None:
+        """Stop routing advertisements to a device."""
+        self.devices.pop(normalize_identifier(device.mac), None)
+        if not self.devices:
+            for cancel in self._cancel_callbacks:
+                cancel()
+            self._cancel_callbacks = []
+
+    @callback
+    def _async_register_callbacks(self) -> None:
+        """Register the advertisement callback once for all locks."""
+        if self._cancel_callbacks:
+            return
+        self._cancel_callbacks = [
+            bluetooth.async_register_callback(
+                self.hass,
+                self._async_handle_advertisement,
+                matcher,
+                bluetooth.BluetoothScanningMode.ACTIVE,
+            )
+            for matcher in self._matchers
+        ]
+
+    @callback
+    def _async_handle_advertisement(
+        self,
+        service_info: bluetooth.BluetoothServiceInfoBleak,
+        change: bluetooth.BluetoothChange,
+    ) -> None:
+        """Route an advertisement to its device."""
+        if device := self.devices.get(normalize_identifier(service_info.address)):
+            device.async_handle_advertisement(service_info)
@@ -0,0 +1,157 @@
+"""On-demand timing of the Yeelock integration's entry points."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import os
+from collections.abc import Callable
+from time import perf_counter
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import PROFILE_DIR
+
+_LOGGER = logging.getLogger(__name__)
+
+_FuncT = TypeVar("_FuncT", bound=Callable[..., Any])
+
+# Samples per call site while a profile is running: [calls, total, max].
+_blocking: dict[str, list[float]] | None = None
+_awaited: dict[str, list[float]] | None = None
+
+
+def _add_sample(samples: dict[str, list[float]], site: str, elapsed: float) -> None:
+    """Add a duration to a call site."""
+    if (entry := samples.get(site)) is None:
+        samples[site] = [1, elapsed, elapsed]
+        return
+    entry[0] += 1
+    entry[1] += elapsed
+    entry[2] = max(entry[2], elapsed)
+
+
+def timed(site: str) -> Callable[[_FuncT], _FuncT]:
+    """Time a function that runs in the event loop.
+
+    Its whole run holds the loop, so the duration is blocking time. When no
+    profile is running the only cost is a single global lookup.
+    """
+
+    def decorator(func: _FuncT) -> _FuncT:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _blocking is None:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if _blocking is not None:
+                    _add_sample(_blocking, site, perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def timed_async(site: str) -> Callable[[_FuncT], _FuncT]:
+    """Time a coroutine from start to finish, including time spent waiting."""
+
+    def decorator(func: _FuncT) -> _FuncT:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _awaited is None:
+                return await func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if _awaited is not None:
+                    _add_sample(_awaited, site, perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _summarize(samples: dict[str, list[float]], duration: float) -> list[dict]:
+    """Turn call site samples into a list sorted by total time."""
+    summary = [
+        {
+            "call_site": site,
+            "calls": int(calls),
+            "total_time": total,
+            "mean": total / calls,
+            "max": longest,
+            "share": total / duration if duration else 0,
+        }
+        for site, (calls, total, longest) in samples.items()
+    ]
+    summary.sort(key=lambda entry: entry["total_time"], reverse=True)
+    return summary
+
+
+def _write_summary(path: str, summary: dict[str, Any]) -> None:
+    """Write a summary to disk."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+
+
+class YeelockProfiler:
+    """Collect timings from the integration's entry points for a fixed time.
+
+    Only functions decorated with timed or timed_async are measured, using
+    perf_counter, so the rest of Home Assistant is not instrumented and the
+    overhead is a pair of clock reads per call. Only one run can be active
+    at a time.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler."""
+        self.hass = hass
+        self._lock = asyncio.Lock()
+        self.last_summary: dict[str, Any] | None = None
+
+    @property
+    def running(self) -> bool:
+        """Return true while timings are being collected."""
+        return self._lock.locked()
+
+    async def async_profile(self, duration: float) -> dict[str, Any]:
+        """Collect timings for duration seconds and write the summary."""
+        global _blocking, _awaited
+
+        if self._lock.locked():
+            raise HomeAssistantError("A Yeelock profile is already running")
+        async with self._lock:
+            _LOGGER.info("Profiling Yeelock for %s seconds", duration)
+            blocking: dict[str, list[float]] = {}
+            awaited: dict[str, list[float]] = {}
+            _blocking, _awaited = blocking, awaited
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                _blocking = _awaited = None
+
+            call_sites = _summarize(blocking, duration)
+            summary: dict[str, Any] = {
+                "duration": duration,
+                "blocking_time": sum(entry["total_time"] for entry in call_sites),
+                "call_sites": call_sites,
+                "awaited": _summarize(awaited, duration),
+            }
+            path = self.hass.config.path(
+                PROFILE_DIR, f"{dt_util.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
+            )
+            await self.hass.async_add_executor_job(_write_summary, path, summary)
+            summary["path"] = path
+            self.last_summary = summary
+            _LOGGER.info("Yeelock profile written to %s", path)
+            return summary
@@ -8,7 +8,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE
+from homeassistant.const import CONF_MAC, PERCENTAGE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -18,15 +18,16 @@ from .device import Yeelock, YeelockDeviceEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Minimum change in percent before a new battery reading is written.
+BATTERY_HYSTERESIS = 2
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
     """Set up the Yeelock sensor platform."""
-    device: Yeelock = hass.data[DOMAIN][entry.unique_id]
-    battery_sensor = YeelockBatterySensor(device, hass)
-    device._battery_sensor = battery_sensor
-    async_add_entities([battery_sensor])
+    device: Yeelock = hass.data[DOMAIN].async_get_device(entry.data[CONF_MAC])
+    async_add_entities([YeelockBatterySensor(device, hass)])
     return True
 
 
@@ -44,17 +45,29 @@ class YeelockBatterySensor(YeelockDeviceEntity, SensorEntity):
         await super().async_added_to_hass()
         if self.device.battery_level is not None:
             self._attr_native_value = self.device.battery_level
-        try:
-            self.hass.async_create_task(self.device.update_battery())
-        except Exception as error:  # pragma: no cover - defensive, device handles this too
-            _LOGGER.warning(
-                "Unable to fetch initial battery level for %s: %s",
-                self.device.mac,
-                error,
-            )
-
-    async def _update_battery_level(self, new_level: int) -> None:
-        """Handle push updates from BLE notifications."""
-        _LOGGER.debug("Setting battery state to %s", new_level)
-        self._attr_native_value = new_level
-        self.async_write_ha_state()
+        if self.device.battery_is_fresh:
+            _LOGGER.debug("Using cached battery level for %s", self.device.mac)
+            return
+        self.device.tasks.async_create_task(
+            self.device.update_battery(), "initial battery"
+        )
+
+    def _coordinator_value(self):
+        """Return the battery level held by the coordinator."""
+        return self.device.battery_level
+
+    def _current_value(self):
+        """Return the battery level reported to Home Assistant."""
+        return self._attr_native_value
+
+    def _set_value(self, value) -> None:
+        """Store the new battery level."""
+        self._attr_native_value = value
+
+    def _value_changed(self, old, new) -> bool:
+        """Ignore battery jitter smaller than the hysteresis."""
+        if old is None or new is None:
+            return old != new
+        if new != old and new in (0, 100):
+            return True
+        return abs(new - old) >= BATTERY_HYSTERESIS
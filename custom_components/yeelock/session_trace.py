@@ -0,0 +1,321 @@
+"""BLE session trace recording and replay for Yeelock devices.
+
+Traces are a flat sequence of fixed-size little endian records:
+
+    timestamp (float64) | event (uint8) | length (uint8) | payload (20 bytes)
+
+Outbound frames only keep their command header, never the signature, so a
+trace can be shared without exposing anything that could be replayed
+against a real lock.
+
+This module has no Home Assistant dependencies so traces can be inspected
+with scripts/trace_tool.py outside of Home Assistant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import threading
+from collections.abc import Callable
+from statistics import mean
+from time import monotonic, time
+from typing import Any, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORD = struct.Struct("<dBB20s")
+PAYLOAD_SIZE = 20
+
+EVENT_CONNECT = 1
+EVENT_DISCONNECT = 2
+EVENT_TX = 3
+EVENT_RX = 4
+EVENT_ERROR = 5
+
+EVENT_NAMES = {
+    EVENT_CONNECT: "connect",
+    EVENT_DISCONNECT: "disconnect",
+    EVENT_TX: "tx",
+    EVENT_RX: "rx",
+    EVENT_ERROR: "error",
+}
+
+COMMAND_LOCKER = 0x01
+COMMAND_BATTERY = 0x06
+COMMAND_TIME_SYNC = 0x08
+
+# Notifications that confirm a lock command.
+FINAL_NOTIFICATIONS = (0x03, 0x05, 0xFF)
+
+# Records buffered in memory before they are written out.
+FLUSH_RECORDS = 64
+MAX_TRACE_BYTES = 1024 * 1024
+TRACE_BACKUPS = 3
+
+
+class TraceRecord(NamedTuple):
+    """A single decoded trace record."""
+
+    timestamp: float
+    event: int
+    payload: bytes
+
+    @property
+    def name(self) -> str:
+        """Return the event name."""
+        return EVENT_NAMES.get(self.event, f"0x{self.event:02x}")
+
+
+def frame_header(frame: bytes) -> bytes:
+    """Return the part of an outbound frame that is safe to record."""
+    if frame[:1] == bytes([COMMAND_LOCKER]) and len(frame) > 6:
+        # Command, admin mode and the lock/unlock kind.
+        return frame[:2] + frame[6:7]
+    return frame[:2]
+
+
+class YeelockTraceRecorder:
+    """Buffer trace records and write them to a rotating file.
+
+    record() is cheap and runs in the event loop. take() and write() split
+    the flush so the file IO can run in an executor.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = MAX_TRACE_BYTES,
+        backups: int = TRACE_BACKUPS,
+    ) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._buffer = bytearray()
+        self._write_lock = threading.Lock()
+
+    def record(self, event: int, payload: bytes = b"") -> bool:
+        """Append a record, returning true when a flush is due."""
+        payload = bytes(payload[:PAYLOAD_SIZE])
+        self._buffer += RECORD.pack(time(), event, len(payload), payload)
+        return len(self._buffer) >= FLUSH_RECORDS * RECORD.size
+
+    def take(self) -> bytes:
+        """Return and clear the buffered records."""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+    def write(self, data: bytes) -> None:
+        """Append records to the trace file, rotating it when full."""
+        if not data:
+            return
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                size = 0
+            if size and size + len(data) > self._max_bytes:
+                self._rotate()
+            with open(self.path, "ab") as trace_file:
+                trace_file.write(data)
+
+    def _rotate(self) -> None:
+        """Shift trace.N to trace.N+1, dropping the oldest file."""
+        for index in range(self._backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self._backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+def read_trace(path: str) -> list[TraceRecord]:
+    """Read all records from a trace file."""
+    with open(path, "rb") as trace_file:
+        data = trace_file.read()
+    usable = len(data) - len(data) % RECORD.size
+    records = [
+        TraceRecord(timestamp, event, payload[:length])
+        for timestamp, event, length, payload in RECORD.iter_unpack(data[:usable])
+    ]
+    records.sort(key=lambda record: record.timestamp)
+    return records
+
+
+def _commands(records: list[TraceRecord]) -> list[tuple[int, int | None]]:
+    """Return (index, kind) for every lock command in the trace."""
+    return [
+        (index, record.payload[2] if len(record.payload) > 2 else None)
+        for index, record in enumerate(records)
+        if record.event == EVENT_TX and record.payload[:1] == bytes([COMMAND_LOCKER])
+    ]
+
+
+def _ack_latency(records: list[TraceRecord], index: int) -> float | None:
+    """Return seconds from a command to its confirming notification."""
+    for record in records[index + 1 :]:
+        if record.event == EVENT_TX and record.payload[:1] == bytes([COMMAND_LOCKER]):
+            return None
+        if record.event == EVENT_RX and record.payload[:1] and (
+            record.payload[0] in FINAL_NOTIFICATIONS
+        ):
+            return record.timestamp - records[index].timestamp
+    return None
+
+
+def summarize(records: list[TraceRecord]) -> dict[str, Any]:
+    """Summarize event counts, connect times and command latencies."""
+    counts: dict[str, int] = {}
+    for record in records:
+        counts[record.name] = counts.get(record.name, 0) + 1
+
+    connect_times = [
+        struct.unpack("<I", record.payload[:4])[0] / 1000
+        for record in records
+        if record.event == EVENT_CONNECT and len(record.payload) >= 4
+    ]
+    latencies = [
+        latency
+        for index, _ in _commands(records)
+        if (latency := _ack_latency(records, index)) is not None
+    ]
+
+    def stats(values: list[float]) -> dict[str, float]:
+        if not values:
+            return {}
+        ordered = sorted(values)
+        return {
+            "count": len(ordered),
+            "mean": mean(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        }
+
+    return {
+        "duration": records[-1].timestamp - records[0].timestamp if records else 0,
+        "events": counts,
+        "connect": stats(connect_times),
+        "ack_latency": stats(latencies),
+    }
+
+
+class ReplayTransport:
+    """In-process transport that answers writes with recorded notifications.
+
+    Implements the YeelockTransport interface without touching a radio.
+    Every outbound frame is matched against the next recorded frame with the
+    same command, and the notifications that followed it in the trace are
+    delivered with their original spacing, divided by speed.
+    """
+
+    name = "replay"
+
+    def __init__(self, records: list[TraceRecord], speed: float = 1.0) -> None:
+        """Initialize the replay transport."""
+        self._records = records
+        self._speed = speed
+        self._position = 0
+        self._callback: Callable[[Any, bytearray], None] | None = None
+        self.is_connected = False
+        self.writes: list[tuple[float, bytes]] = []
+
+    def update_device(self, service_info: Any) -> None:
+        """Ignore advertisements."""
+
+    async def connect(self, disconnected_callback: Callable[[], None]) -> None:
+        """Pretend to connect."""
+        self.is_connected = True
+
+    async def subscribe(self, callback: Callable[[Any, bytearray], None]) -> None:
+        """Store the notification callback."""
+        self._callback = callback
+
+    async def disconnect(self) -> None:
+        """Pretend to disconnect."""
+        self.is_connected = False
+        self._callback = None
+
+    async def write(self, data: bytes) -> None:
+        """Schedule the recorded answer to an outbound frame."""
+        header = frame_header(bytes(data))
+        self.writes.append((monotonic(), header))
+        loop = asyncio.get_running_loop()
+
+        for index in range(self._position, len(self._records)):
+            record = self._records[index]
+            if record.event == EVENT_TX and record.payload[:1] == header[:1]:
+                break
+        else:
+            _LOGGER.debug("No recorded answer for frame 0x%02x", header[0])
+            return
+
+        sent_at = self._records[index].timestamp
+        for answer in self._records[index + 1 :]:
+            if answer.event == EVENT_TX:
+                break
+            if answer.event == EVENT_RX and self._callback is not None:
+                loop.call_later(
+                    (answer.timestamp - sent_at) / self._speed,
+                    self._callback,
+                    None,
+                    bytearray(answer.payload),
+                )
+        self._position = index + 1
+
+
+LOCKER_KINDS = {0x02: "lock", 0x01: "unlock", 0x00: "unlock_quick"}
+
+
+async def async_replay(
+    device, records: list[TraceRecord], speed: float = 1.0
+) -> list[dict[str, Any]]:
+    """Replay the lock commands of a trace through a Yeelock device.
+
+    The device must use a ReplayTransport for the same records. Each
+    recorded lock command is issued at its recorded time, and the time
+    until the device reports a final lock state is compared with the
+    recorded latency.
+    """
+    results: list[dict[str, Any]] = []
+    start = records[0].timestamp if records else 0
+    loop_start = monotonic()
+    for index, kind in _commands(records):
+        if kind not in LOCKER_KINDS:
+            continue
+        delay = (records[index].timestamp - start) / speed - (monotonic() - loop_start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        # Forget the previous result so only this command's ack counts.
+        device.coordinator.lock_state = None
+        done = asyncio.Event()
+        remove = device.coordinator.async_add_listener(
+            lambda: device.lock_state in ("locked", "unlocked", "jammed")
+            and done.set()
+        )
+        issued = monotonic()
+        await device.locker(LOCKER_KINDS[kind])
+        recorded = _ack_latency(records, index)
+        try:
+            await asyncio.wait_for(done.wait(), timeout=(recorded or 5) / speed + 5)
+            replayed = (monotonic() - issued) * speed
+        except TimeoutError:
+            replayed = None
+        finally:
+            remove()
+        results.append(
+            {
+                "command": LOCKER_KINDS[kind],
+                "recorded": recorded,
+                "replayed": replayed,
+            }
+        )
+    return results
@@ -0,0 +1,66 @@
+"""Persistent last known state for Yeelock devices."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_STORE_VERSION = 1
+
+# Seconds to collect changes before they are written to disk.
+STATE_SAVE_DELAY = 30
+
+
+class YeelockStateCache:
+    """Keep the last known state of one lock across restarts.
+
+    The cache is read once when the entry is set up. Updates are coalesced
+    and written with a delay so frequent notifications do not hit the disk.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store = Store[dict[str, Any]](
+            hass, STATE_STORE_VERSION, f"{DOMAIN}.{entry_id}.state"
+        )
+        self.data: dict[str, Any] = {}
+        self._dirty = False
+
+    async def async_load(self) -> dict[str, Any]:
+        """Load the cached state."""
+        self.data = await self._store.async_load() or {}
+        _LOGGER.debug("Loaded cached state: %s", list(self.data))
+        return self.data
+
+    @callback
+    def async_update(self, **changes: Any) -> None:
+        """Merge changes and schedule a save."""
+        if all(self.data.get(key) == value for key, value in changes.items()):
+            return
+        self.data.update(changes)
+        self._dirty = True
+        self._store.async_delay_save(self._data_to_save, STATE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to write."""
+        self._dirty = False
+        return self.data
+
+    async def async_flush(self) -> None:
+        """Write pending changes now instead of after the delay."""
+        if self._dirty:
+            self._dirty = False
+            await self._store.async_save(self.data)
+
+    async def async_remove(self) -> None:
+        """Delete the cached state, dropping any pending write."""
+        self._dirty = False
+        await self._store.async_remove()
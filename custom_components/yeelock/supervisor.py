@@ -0,0 +1,110 @@
+"""Background task supervision for Yeelock devices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# Background operations of one lock allowed to run at the same time.
+MAX_CONCURRENT_TASKS = 2
+
+
+class YeelockTaskSupervisor:
+    """Own every background task started for a config entry.
+
+    Tasks are named after the lock, limited tasks wait for a free slot so a
+    burst of notifications cannot queue up unbounded BLE work, and all tasks
+    are cancelled together when the entry is unloaded.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        max_concurrent: int = MAX_CONCURRENT_TASKS,
+    ) -> None:
+        """Initialize the supervisor."""
+        self._hass = hass
+        self._name = name
+        self._max_concurrent = max_concurrent
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    @callback
+    def async_create_task(
+        self,
+        target: Coroutine[Any, Any, Any],
+        name: str,
+        limited: bool = True,
+    ) -> asyncio.Task | None:
+        """Start a tracked task.
+
+        Long running tasks such as the notification worker, and commands that
+        must not wait behind cloud work such as the auto relock, pass
+        limited=False. Returns None once shut down.
+        """
+        if self._closed:
+            _LOGGER.debug("Not starting %s for %s after shutdown", name, self._name)
+            target.close()
+            return None
+        task = self._hass.async_create_background_task(
+            self._async_run(target) if limited else target, f"{self._name} {name}"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    async def _async_run(self, target: Coroutine[Any, Any, Any]) -> Any:
+        """Run a coroutine once a slot is free."""
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            # Never started, close it to avoid a "never awaited" warning.
+            target.close()
+            raise
+        try:
+            return await target
+        finally:
+            self._slots.release()
+
+    @callback
+    def _task_done(self, task: asyncio.Task) -> None:
+        """Count a finished task."""
+        self._tasks.discard(task)
+        if task.cancelled():
+            self.cancelled += 1
+        elif (error := task.exception()) is not None:
+            self.failed += 1
+            _LOGGER.error("Task %s failed", task.get_name(), exc_info=error)
+        else:
+            self.completed += 1
+
+    async def async_shutdown(self) -> None:
+        """Cancel all tasks and wait for them to finish."""
+        self._closed = True
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            _LOGGER.debug("Cancelling %s task(s) for %s", len(tasks), self._name)
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def diagnostics(self) -> dict[str, int]:
+        """Return task counts for the diagnostics download."""
+        return {
+            "active": len(self._tasks),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "max_concurrent": self._max_concurrent,
+        }
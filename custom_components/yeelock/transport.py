@@ -0,0 +1,121 @@
+"""BLE transports used by Yeelock devices."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from bleak import BleakClient
+from bleak.exc import BleakError
+from bleak_retry_connector import establish_connection
+from homeassistant.components import bluetooth
+from homeassistant.core import HomeAssistant
+
+from .const import UUID_COMMAND, UUID_NOTIFY
+
+_LOGGER = logging.getLogger(__name__)
+
+NotificationCallback = Callable[[Any, bytearray], None]
+
+
+class YeelockTransport(Protocol):
+    """Move frames between a Yeelock device and the lock.
+
+    The device only deals in signed frames and notifications; how the link
+    is established is up to the transport. Failures are raised as
+    BleakError so the device handles every transport the same way.
+    """
+
+    name: str
+
+    @property
+    def is_connected(self) -> bool:
+        """Return true while frames can be written."""
+
+    def update_device(self, service_info: bluetooth.BluetoothServiceInfoBleak) -> None:
+        """Use the latest advertisement to reach the lock."""
+
+    async def connect(self, disconnected_callback: Callable[[], None]) -> None:
+        """Open the link, calling disconnected_callback when it drops."""
+
+    async def subscribe(self, callback: NotificationCallback) -> None:
+        """Deliver notifications from the lock to callback."""
+
+    async def write(self, data: bytes) -> None:
+        """Write a frame to the command characteristic."""
+
+    async def disconnect(self) -> None:
+        """Close the link."""
+
+
+class BleakTransport:
+    """Connect through Home Assistant's bluetooth stack with bleak.
+
+    Any adapter or proxy known to Home Assistant may be used, and connection
+    attempts are retried by bleak-retry-connector.
+    """
+
+    name = "bleak"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        address: str,
+        connection_slots: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Initialize the transport."""
+        self._hass = hass
+        self._address = address
+        self._connection_slots = connection_slots
+        self._ble_device = None
+        self._client: BleakClient | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Return true while frames can be written."""
+        return self._client is not None and self._client.is_connected
+
+    def update_device(self, service_info: bluetooth.BluetoothServiceInfoBleak) -> None:
+        """Use the latest advertisement to reach the lock."""
+        self._ble_device = service_info.device
+
+    async def connect(self, disconnected_callback: Callable[[], None]) -> None:
+        """Open the link, calling disconnected_callback when it drops.
+
+        The device from the latest routed advertisement is used, falling back
+        to a lookup when none has been seen since setup.
+        """
+        if self._ble_device is None:
+            self._ble_device = bluetooth.async_ble_device_from_address(
+                self._hass, self._address, connectable=True
+            )
+        if not self._ble_device:
+            raise BleakError(
+                f"A device with address {self._address} could not be found."
+            )
+        slot = self._connection_slots or contextlib.nullcontext()
+        async with slot:
+            self._client = await establish_connection(
+                BleakClient,
+                self._ble_device,
+                self._address,
+                disconnected_callback=lambda _client: disconnected_callback(),
+                max_attempts=3,
+            )
+
+    async def subscribe(self, callback: NotificationCallback) -> None:
+        """Deliver notifications from the lock to callback."""
+        await self._client.start_notify(uuid.UUID(UUID_NOTIFY), callback)
+
+    async def write(self, data: bytes) -> None:
+        """Write a frame to the command characteristic."""
+        await self._client.write_gatt_char(uuid.UUID(UUID_COMMAND), bytearray(data))
+
+    async def disconnect(self) -> None:
+        """Close the link."""
+        if self.is_connected:
+            await self._client.disconnect()
@@ -0,0 +1,122 @@
+"""Local stand-in for the Yeelock cloud API.
+
+Serves the two endpoints used by the integration so the cloud client and the
+config flow can be exercised offline:
+
+    python3 scripts/fake_cloud.py --port 8765 --locks 40
+
+and point the integration at it in config/configuration.yaml before running
+scripts/develop:
+
+    yeelock:
+      api_url: http://127.0.0.1:8765
+
+Latency and error injection can be used to load-test retries and timeouts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import secrets
+from collections import Counter
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger("fake_cloud")
+
+
+def build_locks(count: int) -> list[dict]:
+    """Build a deterministic list of fake locks."""
+    locks = []
+    for index in range(count):
+        mac = f"F0:F8:F2:00:{index // 256:02X}:{index % 256:02X}"
+        serial = mac.replace(":", "")
+        locks.append(
+            {
+                "sn": serial,
+                "name": f"EL_{serial}",
+                "mac": mac,
+                "type": "M02",
+                "ble_sign_key": secrets.token_hex(16),
+            }
+        )
+    return locks
+
+
+class FakeCloud:
+    """In-memory Yeelock cloud."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        """Initialize the fake cloud."""
+        self.account = args.account
+        self.password = args.password
+        self.latency = args.latency / 1000
+        self.error_rate = args.error_rate
+        self.locks = build_locks(args.locks)
+        self.tokens: set[str] = set()
+        self.requests: Counter[str] = Counter()
+
+    async def _simulate_network(self, endpoint: str) -> web.Response | None:
+        """Apply latency and random failures."""
+        self.requests[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        return None
+
+    async def auth_by_password(self, request: web.Request) -> web.Response:
+        """Handle /v2/auth/by/password."""
+        if failure := await self._simulate_network("auth"):
+            return failure
+        form = await request.post()
+        if form.get("account") != self.account:
+            return web.json_response({"code": 1009, "message": "Not registered"})
+        if form.get("password") != self.password:
+            return web.json_response({"code": 401, "message": "Invalid password"})
+        token = secrets.token_hex(16)
+        self.tokens.add(token)
+        return web.json_response({"code": 0, "data": {"access_token": token}})
+
+    async def device_list(self, request: web.Request) -> web.Response:
+        """Handle /v2/user/device/list."""
+        if failure := await self._simulate_network("device_list"):
+            return failure
+        if request.headers.get("Authorization") not in self.tokens:
+            return web.json_response({"code": 401, "message": "Invalid token"})
+        return web.json_response({"code": 0, "data": self.locks})
+
+    async def on_shutdown(self, app: web.Application) -> None:
+        """Print a request summary."""
+        _LOGGER.info("Requests served: %s", dict(self.requests))
+
+
+def main() -> None:
+    """Run the fake cloud server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--locks", type=int, default=5)
+    parser.add_argument("--account", default="user@example.com")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0, help="0.0 - 1.0")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    cloud = FakeCloud(args)
+    for lock in cloud.locks:
+        _LOGGER.info("Lock %s (%s)", lock["name"], lock["mac"])
+
+    app = web.Application()
+    app.router.add_post("/v2/auth/by/password", cloud.auth_by_password)
+    app.router.add_get("/v2/user/device/list", cloud.device_list)
+    app.on_shutdown.append(cloud.on_shutdown)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
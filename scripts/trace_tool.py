@@ -0,0 +1,86 @@
+"""Inspect and replay Yeelock BLE session traces.
+
+    python3 scripts/trace_tool.py dump config/yeelock_traces/F0F8F2000001.trace
+    python3 scripts/trace_tool.py summary config/yeelock_traces/F0F8F2000001.trace
+    python3 scripts/trace_tool.py replay config/yeelock_traces/F0F8F2000001.trace
+
+dump and summary only need the standard library. replay drives the Yeelock
+device class over an in-process replay transport and needs Home Assistant installed (see
+scripts/setup).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "custom_components"))
+sys.path.insert(1, str(ROOT / "custom_components" / "yeelock"))
+
+import session_trace  # noqa: E402
+
+
+def _write(line: str) -> None:
+    sys.stdout.write(f"{line}\n")
+
+
+def dump(records: list[session_trace.TraceRecord]) -> None:
+    """Print every record."""
+    for record in records:
+        _write(
+            f"{datetime.fromtimestamp(record.timestamp).isoformat()} "
+            f"{record.name:<10} {record.payload.hex()}"
+        )
+
+
+async def replay(records: list[session_trace.TraceRecord], speed: float) -> list:
+    """Replay a trace through the device class."""
+    from homeassistant.const import CONF_API_KEY, CONF_MAC, CONF_NAME
+    from homeassistant.core import HomeAssistant
+    from yeelock import session_trace as device_trace
+    from yeelock.device import Yeelock
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        device = Yeelock(
+            {
+                CONF_MAC: "00:00:00:00:00:00",
+                CONF_NAME: "Replay",
+                CONF_API_KEY: "00" * 16,
+            },
+            hass,
+            transport=device_trace.ReplayTransport(records, speed),
+        )
+        try:
+            return await device_trace.async_replay(device, records, speed)
+        finally:
+            await device.disconnect()
+            await hass.async_stop(force=True)
+
+
+def main() -> None:
+    """Run the trace tool."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("dump", "summary", "replay"))
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    records = session_trace.read_trace(args.trace)
+    if args.command == "dump":
+        dump(records)
+    elif args.command == "summary":
+        _write(json.dumps(session_trace.summarize(records), indent=2))
+    else:
+        results = asyncio.run(replay(records, args.speed))
+        _write(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()